@@ -15,6 +15,13 @@ from routes.history_routes import history_bp
 from routes.categories import category_bp
 from routes.questions import question_bp
 from routes.users import user_bp
+from routes.quiz_routes import prefetch_dynamic_payload
+from routes.search import search_bp
+from backend.services import warm_services
+from backend.services.dynamic_quiz_buffer import dynamic_quiz_buffer
+from backend.services.history_writer import history_writer
+from backend.services.user_stats import rebuild_user_stats
+from backend.services.question_stats import rebuild_question_stats
 from flask_jwt_extended import JWTManager, get_jwt
 
 migrate = Migrate()
@@ -90,6 +97,36 @@ def create_app():
     app.register_blueprint(category_bp, url_prefix='/api')
     app.register_blueprint(question_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(search_bp, url_prefix='/api')
+
+    # Build in-process indexes from the database
+    warm_services(app)
+    if app.config.get('DYNAMIC_QUIZ_PREFETCH'):
+        # Start the producer with the first request served, so CLI commands never spawn it
+        @app.before_request
+        def start_dynamic_quiz_producer():
+            dynamic_quiz_buffer.start(app, prefetch_dynamic_payload)
+    history_writer.configure(mode=app.config.get('HISTORY_WRITE_MODE', 'sync'),
+                             max_queue=app.config.get('HISTORY_QUEUE_MAX'),
+                             batch_size=app.config.get('HISTORY_BATCH_SIZE'),
+                             flush_interval=app.config.get('HISTORY_FLUSH_INTERVAL_MS', 50) / 1000)
+    if history_writer.mode != 'sync':
+        # Like the producer, the writer thread (and its exit-time flush) only runs in a serving process
+        @app.before_request
+        def start_history_writer():
+            history_writer.start(app)
+
+    @app.cli.command('backfill-user-stats')
+    def backfill_user_stats():
+        """Rebuild the user_stats rollup from quiz_history."""
+        count = rebuild_user_stats()
+        print(f"✅ Rebuilt user stats: {count} rows")
+
+    @app.cli.command('backfill-question-stats')
+    def backfill_question_stats():
+        """Rebuild the per-question answer counters from user_answer."""
+        count = rebuild_question_stats()
+        print(f"✅ Rebuilt question stats: {count} rows")
 
     # Health check route for debugging
     @app.route('/health', methods=['GET'])
@@ -103,7 +140,8 @@ def create_app():
                 "/api/quizzes",
                 "/api/categories",
                 "/api/questions",
-                "/api/users"
+                "/api/users",
+                "/api/search"
             ]
         }), 200
 
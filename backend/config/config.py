@@ -7,6 +7,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('SECRET_KEY')
+
+    # Background producer of pre-built rapid-fire/multiplayer dynamic quizzes
+    DYNAMIC_QUIZ_PREFETCH = os.getenv('DYNAMIC_QUIZ_PREFETCH', 'True') == 'True'
+
+    # QuizHistory writes: 'sync' (inline commit), 'queued' (ack on enqueue) or 'committed' (ack after group commit)
+    HISTORY_WRITE_MODE = os.getenv('HISTORY_WRITE_MODE', 'sync')
+    HISTORY_QUEUE_MAX = int(os.getenv('HISTORY_QUEUE_MAX', 10000))
+    HISTORY_BATCH_SIZE = int(os.getenv('HISTORY_BATCH_SIZE', 500))
+    HISTORY_FLUSH_INTERVAL_MS = int(os.getenv('HISTORY_FLUSH_INTERVAL_MS', 50))
     
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
@@ -12,4 +12,10 @@ from .user import User
 from .admin import Admin
 from .question_option import QuestionOption
 from .user_answer import UserAnswer
-from .standalone_ques import StandaloneQuestion
\ No newline at end of file
+from .standalone_ques import StandaloneQuestion
+from .user_seen_question import UserSeenQuestions
+from .quiz_attempt_counter import QuizAttemptCounter
+from .user_stats import UserStats
+from .user_daily_score import UserDailyScore
+from .user_summary import UserSummary
+from .question_stats import QuestionStats
@@ -0,0 +1,15 @@
+from backend.models import db
+
+class QuestionStats(db.Model):
+    __tablename__ = 'question_stats'
+    quiz_key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # quiz_id, or 0 for standalone questions
+    question_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # question.id or standalone_question.id
+    option_key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Picked option position, 0 if unanswered
+    picks = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)  # Picks graded correct
+    score_sum = db.Column(db.BigInteger, nullable=False, default=0)  # Attempt scores of those picks
+    score_sq_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    correct_score_sum = db.Column(db.BigInteger, nullable=False, default=0)  # Attempt scores of correct picks
+
+    def __repr__(self):
+        return f'<QuestionStats quiz={self.quiz_key} question={self.question_id} option={self.option_key} picks={self.picks}>'
@@ -3,6 +3,10 @@ from .category import Category
 from .admin import Admin
 
 class Quiz(db.Model):
+    __table_args__ = (
+        db.Index('ix_quiz_active_created_at_id', 'is_active', 'created_at', 'id'),  # Catalog keyset pagination
+        db.Index('ix_quiz_active_title_id', 'is_active', 'title', 'id'),  # Title prefix search / sort
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
@@ -0,0 +1,11 @@
+from backend.models import db
+
+class QuizAttemptCounter(db.Model):
+    __tablename__ = 'quiz_attempt_counter'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    quiz_key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # quiz_id, or 0 for dynamic quizzes
+    category_key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # category_id, or 0 for all categories
+    last_attempt = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<QuizAttemptCounter user_id={self.user_id} quiz={self.quiz_key} category={self.category_key} last={self.last_attempt}>'
@@ -4,6 +4,12 @@ from .quiz import Quiz
 from .category import Category
 
 class QuizHistory(db.Model):
+    __table_args__ = (
+        db.Index('ux_quiz_history_user_client_attempt', 'user_id', 'client_attempt_id', unique=True),  # Offline sync idempotency
+        db.Index('ix_quiz_history_user_completed_id', 'user_id', 'completed_at', 'id'),  # History keyset pagination
+        db.Index('ix_quiz_history_quiz_user_score', 'quiz_id', 'user_id', 'score'),  # Per-quiz leaderboard (index-only load)
+        db.Index('ix_quiz_history_user_attempt', 'user_id', 'attempt_number'),  # Linking answers to just-inserted attempts
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=True)  # Allow null for dynamic quizzes
@@ -15,6 +21,7 @@ class QuizHistory(db.Model):
     started_at = db.Column(db.DateTime, server_default=db.func.now())
     completed_at = db.Column(db.DateTime, nullable=True)
     status = db.Column(db.Enum('in_progress', 'completed'), default='in_progress', nullable=False)
+    client_attempt_id = db.Column(db.String(64), nullable=True)  # Idempotency key sent by offline clients
     user = db.relationship('User', backref=db.backref('quiz_histories', lazy=True))
     quiz = db.relationship('Quiz', backref=db.backref('histories', lazy=True))
     category = db.relationship('Category', backref=db.backref('quiz_histories', lazy=True))
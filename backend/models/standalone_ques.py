@@ -11,6 +11,8 @@ class StandaloneQuestion(db.Model):
     options = db.Column(db.JSON, nullable=True)  # For multiple choice, true/false, etc.
     answer = db.Column(db.String(200), nullable=False)
     explanation = db.Column(db.String(1000), nullable=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True, index=True)  # Scopes dynamic quizzes
+    category = db.relationship('Category', backref=db.backref('standalone_questions', lazy=True))
 
     def __repr__(self):
         return f'<StandaloneQuestion {self.question}>'
\ No newline at end of file
@@ -1,18 +1,22 @@
 from backend.models import db
 from .user import User
 from .question import Question
-from .question_option import QuestionOption
+from .standalone_ques import StandaloneQuestion
 
 class UserAnswer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
-    option_id = db.Column(db.Integer, db.ForeignKey('question_option.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=True)  # Null for dynamic quizzes
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=True)  # Set for quiz questions
+    standalone_question_id = db.Column(db.Integer, db.ForeignKey('standalone_questions.id', ondelete='CASCADE'), nullable=True)  # Set for dynamic quiz questions
+    history_id = db.Column(db.Integer, db.ForeignKey('quiz_history.id'), nullable=True, index=True)  # Attempt the answer was submitted with
+    option_id = db.Column(db.Integer, nullable=True)  # 1-based position in the question's options, as submitted
     is_correct = db.Column(db.Boolean, default=False, nullable=False)
     answered_at = db.Column(db.DateTime, server_default=db.func.now())
     user = db.relationship('User', backref=db.backref('answers', lazy=True))
     question = db.relationship('Question', backref=db.backref('user_answers', lazy=True))
-    option = db.relationship('QuestionOption', backref=db.backref('user_answers', lazy=True))
+    # Answers go with their standalone question; the database deletes them, so the ORM never loads them
+    standalone_question = db.relationship('StandaloneQuestion', backref=db.backref('user_answers', lazy=True, passive_deletes=True))
 
     def __repr__(self):
-        return f'<UserAnswer user_id={self.user_id} question_id={self.question_id}>'
\ No newline at end of file
+        return f'<UserAnswer user_id={self.user_id} question_id={self.question_id or self.standalone_question_id}>'
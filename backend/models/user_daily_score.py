@@ -0,0 +1,14 @@
+from backend.models import db
+
+class UserDailyScore(db.Model):
+    __tablename__ = 'user_daily_score'
+    __table_args__ = (
+        db.Index('ix_user_daily_score_day', 'day'),  # Window scans and expiry
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # Day the attempts were completed
+    points = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UserDailyScore user_id={self.user_id} day={self.day} points={self.points}>'
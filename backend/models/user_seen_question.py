@@ -0,0 +1,10 @@
+from backend.models import db
+
+class UserSeenQuestions(db.Model):
+    __tablename__ = 'user_seen_questions'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    seen_bits = db.Column(db.LargeBinary(length=(2**24) - 1), nullable=False)  # Bitset indexed by StandaloneQuestion.id
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    def __repr__(self):
+        return f'<UserSeenQuestions user_id={self.user_id} bytes={len(self.seen_bits or b"")}>'
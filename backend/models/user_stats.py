@@ -0,0 +1,14 @@
+from backend.models import db
+
+class UserStats(db.Model):
+    __tablename__ = 'user_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category_key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # category_id, or 0 for "All Categories"
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+    time_sum = db.Column(db.BigInteger, nullable=False, default=0)  # Seconds
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<UserStats user_id={self.user_id} category={self.category_key} attempts={self.attempts}>'
@@ -0,0 +1,17 @@
+from backend.models import db
+
+class UserSummary(db.Model):
+    __tablename__ = 'user_summary'
+    __table_args__ = (
+        db.Index('ix_user_summary_last_completed', 'last_completed_at', 'user_id'),  # Admin listing sorts (keyset)
+        db.Index('ix_user_summary_avg_score', 'avg_score', 'user_id'),
+        db.Index('ix_user_summary_attempts', 'attempts', 'user_id'),
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    avg_score = db.Column(db.Numeric(5, 2), nullable=False, default=0)  # score_sum / attempts, kept for sorting
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<UserSummary user_id={self.user_id} attempts={self.attempts} avg_score={self.avg_score}>'
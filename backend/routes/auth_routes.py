@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import create_access_token, jwt_required, unset_jwt_cookies
-from backend.models import db, User, Admin
+from backend.models import db, User, Admin, UserSummary
+from backend.services.leaderboard import leaderboard
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import timedelta
 import traceback
@@ -46,7 +47,10 @@ def register():
         print("Step 7: Created new user entity - new_entity: {new_entity}")
 
         db.session.add(new_entity)
+        db.session.flush()
+        db.session.add(UserSummary(user_id=new_entity.id))  # Listed in the admin user table from the start
         db.session.commit()
+        leaderboard.add_user(new_entity.id, new_entity.username)
         print("Step 8: Entity saved to database - new_entity.id: {new_entity.id}")
 
         access_token = create_access_token(
@@ -1,6 +1,10 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from backend.models import db, Category, Quiz
+from backend.models import db, Category, StandaloneQuestion
+from backend.services.quiz_cache import quiz_payload_cache
+from backend.services.category_cache import category_list_cache
+from backend.services.question_sampler import question_sampler
+from backend.services.dynamic_quiz_buffer import dynamic_quiz_buffer
 from sqlalchemy.exc import IntegrityError
 import json
 
@@ -32,7 +36,7 @@ def check_admin():
 @category_bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_categories():
-    """Fetch all categories."""
+    """Fetch all categories with their quiz counts (served from category_list_cache)."""
     print("Received GET /categories request")
     try:
         is_admin, result = check_admin()
@@ -40,20 +44,8 @@ def get_categories():
             response, status = result
             return response, status
 
-        categories = Category.query.all()
-        print(f"Found {len(categories)} categories")
-        result = []
-        for category in categories:
-            quiz_count = Quiz.query.filter_by(category_id=category.id).count()
-            print(f"Category {category.id}: {quiz_count} quizzes")
-            result.append({
-                'id': category.id,
-                'name': category.name,
-                'description': category.description,
-                'icon': category.icon,
-                'isActive': category.is_active,
-                'quizCount': quiz_count
-            })
+        result = category_list_cache.categories()
+        print(f"Found {len(result)} categories")
         return jsonify(result), 200
     except Exception as e:
         print(f"Error fetching categories: {str(e)}")
@@ -90,6 +82,7 @@ def create_category():
         )
         db.session.add(new_category)
         db.session.commit()
+        category_list_cache.clear()
         print("Committed category to database")
         return jsonify({
             'id': new_category.id,
@@ -136,8 +129,10 @@ def update_category(category_id):
         category.icon = icon
         category.is_active = is_active
         db.session.commit()
+        quiz_payload_cache.clear()  # Prepared quiz payloads embed the category name/icon
+        quiz_count = category_list_cache.quiz_count(category.id)  # Unchanged by a category edit
+        category_list_cache.clear()
         print("Updated category in database")
-        quiz_count = Quiz.query.filter_by(category_id=category.id).count()
         return jsonify({
             'id': category.id,
             'name': category.name,
@@ -167,8 +162,14 @@ def delete_category(category_id):
 
     category = Category.query.get_or_404(category_id)
     try:
+        # Standalone questions outlive their category as uncategorized questions
+        StandaloneQuestion.query.filter_by(category_id=category_id).update({'category_id': None}, synchronize_session=False)
         db.session.delete(category)
         db.session.commit()
+        question_sampler.drop_category(category_id)
+        dynamic_quiz_buffer.clear()  # Buffered payloads may come from the dropped pool
+        quiz_payload_cache.clear()
+        category_list_cache.clear()
         print("Deleted category from database")
         return jsonify({'message': 'Category deleted successfully'}), 200
     except Exception as e:
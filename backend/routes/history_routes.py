@@ -1,29 +1,81 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models import db, QuizHistory, Quiz
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from backend.models import db, QuizHistory, Quiz, Category, User
+from backend.services.history_writer import history_writer
+from backend.services.attempt_counter import claim_attempt_numbers
+from backend.services.user_stats import read_user_stats
+from routes.quiz_routes import history_query, history_page, HISTORY_DEFAULT_LIMIT, HISTORY_MAX_LIMIT
 from datetime import datetime
+import csv
+import io
+import json
 
 history_bp = Blueprint('history', __name__)
 
-@history_bp.route('/history', methods=['GET'])
-@jwt_required()
-def get_history():
-    """Fetch the quiz history for the authenticated user."""
-    user_id = get_jwt_identity()
-    history = QuizHistory.query.filter_by(user_id=user_id).order_by(QuizHistory.completed_at.desc()).all()
-    print(f"[{datetime.now()}] Found {len(history)} history entries for user {user_id}")
-    return jsonify([{
+def serialize_history_entry(h):
+    return {
         'id': h.id,
         'quiz_id': h.quiz_id,
+        'quiz_title': h.quiz_title,
+        'category_name': h.category_name,
         'score': h.score,
         'total_questions': h.total_questions,
         'time_taken': h.time_taken,
         'attempt_number': h.attempt_number,
-        'started_at': h.started_at.isoformat(),
-        'completed_at': h.completed_at.isoformat(),
+        'started_at': h.started_at.isoformat() if h.started_at else None,
+        'completed_at': h.completed_at.isoformat() if h.completed_at else None,
         'status': h.status,
         'category_id': h.category_id
-    } for h in history]), 200
+    }
+
+@history_bp.route('/history', methods=['GET'])
+@jwt_required()
+def get_history():
+    """Fetch the quiz history for the authenticated user.
+
+    Pass `limit` and/or `cursor` for a keyset page {history, next_cursor, limit}.
+    """
+    user_id = get_jwt_identity()
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    query = history_query(user_id)
+
+    if limit is None and not cursor:
+        history = query.order_by(QuizHistory.completed_at.desc(), QuizHistory.id.desc()).all()
+        print(f"[{datetime.now()}] Found {len(history)} history entries for user {user_id}")
+        return jsonify([serialize_history_entry(h) for h in history]), 200
+
+    limit = max(1, min(limit or HISTORY_DEFAULT_LIMIT, HISTORY_MAX_LIMIT))
+    try:
+        history, next_cursor = history_page(query, cursor, limit)
+    except (ValueError, TypeError) as e:
+        print(f"[{datetime.now()}] {str(e)}")
+        return jsonify({'message': 'Invalid cursor'}), 400
+    print(f"[{datetime.now()}] Returning history page with {len(history)} entries for user {user_id}")
+    return jsonify({
+        'history': [serialize_history_entry(h) for h in history],
+        'next_cursor': next_cursor,
+        'limit': limit
+    }), 200
+
+@history_bp.route('/history/stats', methods=['GET'])
+@jwt_required()
+def get_history_stats():
+    """Attempt totals, average/best score, total time and per-category breakdown from the stats rollup.
+
+    Admins can pass `user_id` to read another user's stats.
+    """
+    user_id = get_jwt_identity()
+    role = get_jwt().get('role')
+    if role not in ['admin', 'user']:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    if role == 'admin':
+        user_id = request.args.get('user_id', type=int)
+        if user_id is None:
+            return jsonify({'message': 'user_id is required'}), 400
+    stats = read_user_stats(int(user_id))
+    print(f"[{datetime.now()}] Returning stats for user {user_id}: {stats['totals']['attempts']} attempts")
+    return jsonify(stats), 200
 
 @history_bp.route('/history', methods=['POST'])
 @jwt_required()
@@ -59,26 +111,102 @@ def add_history():
         print(f"[{datetime.now()}] Invalid datetime format: {ve}")
         return jsonify({'message': 'Invalid date format'}), 400
 
-    # Calculate attempt number based on existing history
-    attempt_number = (db.session.query(func.count(QuizHistory.id)).filter_by(
-        user_id=user_id, quiz_id=quiz_id, category_id=category_id
-    ).scalar() or 0) + 1
-
-    new_history = QuizHistory(
-        user_id=user_id,
-        quiz_id=quiz_id,  # Can be None for dynamic quizzes
-        category_id=category_id,
-        score=score,
-        total_questions=total_questions,
-        time_taken=time_taken,
-        attempt_number=attempt_number,
-        started_at=started_at_dt,
-        completed_at=completed_at_dt,
-        status=status,
-        mode=data.get('mode', 'standard')  # Add mode for consistency
-    )
-    db.session.add(new_history)
-    db.session.commit()
+    attempt_number = claim_attempt_numbers(user_id, quiz_id, category_id)
+
+    history_writer.write({
+        'user_id': int(user_id),
+        'quiz_id': quiz_id,  # Can be None for dynamic quizzes
+        'category_id': category_id,
+        'score': score,
+        'total_questions': total_questions,
+        'time_taken': time_taken,
+        'attempt_number': attempt_number,
+        'started_at': started_at_dt,
+        'completed_at': completed_at_dt,
+        'status': status
+    })
 
     print(f"[{datetime.now()}] Quiz history added for user {user_id}, quiz_id: {quiz_id}, score: {score}")
     return jsonify({'message': 'Quiz history added successfully'}), 201
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = [
+    'id', 'user_id', 'username', 'quiz_id', 'quiz_title', 'category_id', 'category_name', 'score',
+    'total_questions', 'time_taken', 'attempt_number', 'started_at', 'completed_at', 'status'
+]
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+@history_bp.route('/admin/history/export', methods=['GET'])
+@jwt_required()
+def export_history():
+    """Stream every matching QuizHistory row as NDJSON (default) or CSV.
+
+    Filters: `from` / `to` (ISO dates on completed_at), `category_id`, `quiz_id`. Rows are read
+    through a server-side cursor in chunks of EXPORT_CHUNK_SIZE and written to the response as
+    each chunk arrives, so worker memory does not grow with the size of the export.
+    """
+    if get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Only admins can export history'}), 403
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ['ndjson', 'csv']:
+        return jsonify({'message': 'Invalid format, expected ndjson or csv'}), 400
+
+    statement = db.select(
+        QuizHistory.id, QuizHistory.user_id, User.username, QuizHistory.quiz_id, Quiz.title.label('quiz_title'),
+        QuizHistory.category_id, Category.name.label('category_name'), QuizHistory.score,
+        QuizHistory.total_questions, QuizHistory.time_taken, QuizHistory.attempt_number,
+        QuizHistory.started_at, QuizHistory.completed_at, QuizHistory.status
+    ).outerjoin(User, User.id == QuizHistory.user_id
+    ).outerjoin(Quiz, Quiz.id == QuizHistory.quiz_id
+    ).outerjoin(Category, Category.id == QuizHistory.category_id)
+    try:
+        if request.args.get('from'):
+            statement = statement.where(QuizHistory.completed_at >= datetime.fromisoformat(request.args['from']))
+        if request.args.get('to'):
+            statement = statement.where(QuizHistory.completed_at < datetime.fromisoformat(request.args['to']))
+        if request.args.get('category_id'):
+            statement = statement.where(QuizHistory.category_id == int(request.args['category_id']))
+        if request.args.get('quiz_id'):
+            statement = statement.where(QuizHistory.quiz_id == int(request.args['quiz_id']))
+    except ValueError as e:
+        print(f"[{datetime.now()}] Invalid export filter: {e}")
+        return jsonify({'message': 'Invalid filter value'}), 400
+    statement = statement.order_by(QuizHistory.id).execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE)
+
+    def generate():
+        exported = 0
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == 'csv':
+            writer.writerow(EXPORT_COLUMNS)
+        try:
+            for chunk in db.session.execute(statement).partitions():
+                for row in chunk:
+                    values = [export_value(value) for value in row]
+                    if export_format == 'csv':
+                        writer.writerow(values)
+                    else:
+                        buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+                        buffer.write('\n')
+                exported += len(chunk)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if export_format == 'csv' and not exported:
+                yield buffer.getvalue()
+        finally:
+            db.session.rollback()
+            print(f"[{datetime.now()}] History export finished: {exported} rows as {export_format}")
+
+    extension = 'csv' if export_format == 'csv' else 'ndjson'
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    print(f"[{datetime.now()}] Starting history export as {export_format} with filters {dict(request.args)}")
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=quiz_history.{extension}'}
+    )
@@ -1,6 +1,8 @@
 # routes/questions.py
 from flask import Blueprint, request, jsonify
-from backend.models import db, StandaloneQuestion
+from backend.models import db, Category, StandaloneQuestion
+from backend.services.search_index import search_index
+from backend.services.question_sampler import question_sampler
 
 question_bp = Blueprint('questions', __name__)
 
@@ -21,15 +23,29 @@ def add_question():
             if field not in data or not data[field]:
                 return jsonify({'error': f'Missing or empty {field}'}), 400
 
+        category_id = data.get('category_id')
+        if category_id not in (None, ''):
+            try:
+                category_id = int(category_id)
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid category_id'}), 400
+            if not Category.query.get(category_id):
+                return jsonify({'error': 'Category not found'}), 400
+        else:
+            category_id = None
+
         new_question = StandaloneQuestion(
             question=data['question'],
             question_type=data['question_type'],
             options=data['options'],
             answer=data['answer'],
-            explanation=data.get('explanation', '')
+            explanation=data.get('explanation', ''),
+            category_id=category_id
         )
         db.session.add(new_question)
         db.session.commit()
+        search_index.upsert_question(new_question)
+        question_sampler.add(new_question.id, new_question.category_id)
 
         return jsonify({'message': 'Question added successfully', 'id': new_question.id}), 201
     except Exception as e:
@@ -1,62 +1,127 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from backend.models import db, Question, Admin, Quiz, QuizHistory, StandaloneQuestion
-from sqlalchemy import func
+from backend.models import db, Question, Admin, Category, Quiz, QuizHistory, StandaloneQuestion, User, UserAnswer
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-import time
-import random
+import base64
+import json
 import traceback
 import requests
+from backend.services.search_index import search_index
+from backend.services.quiz_cache import quiz_payload_cache
+from backend.services.category_cache import category_list_cache
+from backend.services.question_sampler import question_sampler
+from backend.services.seen_questions import seen_question_tracker
+from backend.services.shuffle import new_attempt_seed, shuffle_questions
+from backend.services.dynamic_quiz_buffer import dynamic_quiz_buffer
+from backend.services.grading import parse_answers, grade_answers, grade_attempt_matrix, user_answer_rows
+from backend.services.answer_keys import answer_key_index
+from backend.services.history_writer import history_writer, insert_attempts, attempts_committed
+from backend.services.attempt_counter import claim_attempt_numbers
+from backend.services.question_stats import read_question_stats, reset_question_stats, summarize_question
 
 quiz_bp = Blueprint('quiz', __name__)
 
-# Custom random number generator using Linear Congruential Generator (LCG)
-class CustomRandom:
-    def __init__(self):
-        # Initialize seed with current timestamp (in milliseconds)
-        try:
-            self.seed = int(time.time() * 1000) & 0xFFFFFFFF  # Keep within 32 bits
-        except Exception as e:
-            print(f"[{datetime.now()}] Error initializing CustomRandom seed: {str(e)}")
-            raise
-        # LCG parameters
-        self.a = 1664525
-        self.c = 1013904223
-        self.m = 2**32  # 4294967296
-
-    def next(self, min_val, max_val):
-        """Generate a pseudo-random integer in range [min_val, max_val]."""
-        try:
-            self.seed = (self.a * self.seed + self.c) % self.m
-            range_size = max_val - min_val + 1
-            if range_size <= 0:
-                print(f"[{datetime.now()}] Invalid range in CustomRandom.next: min_val={min_val}, max_val={max_val}")
-                return min_val
-            return min_val + (self.seed % range_size)
-        except Exception as e:
-            print(f"[{datetime.now()}] Error in CustomRandom.next: {str(e)}")
-            raise
-
-# Custom shuffle function using Fisher-Yates with custom random number generator
-def custom_shuffle(items):
-    """Custom Fisher-Yates Shuffle using a custom LCG random number generator."""
+def catalog_query():
+    """Active quizzes with their category name/icon, selected as plain columns in a single query."""
+    return db.session.query(
+        Quiz.id,
+        Quiz.title,
+        Quiz.category_id,
+        Quiz.difficulty,
+        Quiz.description,
+        Quiz.time_limit,
+        Quiz.is_active,
+        Quiz.created_at,
+        Category.name.label('category_name'),
+        Category.icon.label('category_icon')
+    ).outerjoin(Category, Category.id == Quiz.category_id
+    ).filter(Quiz.is_active.is_(True))
+
+def serialize_catalog_row(row):
+    """Map a catalog_query() row to the quiz card payload used by the app."""
+    return {
+        'id': str(row.id),
+        'title': row.title or 'Unnamed Quiz',
+        'category': {
+            'id': str(row.category_id),
+            'name': row.category_name or 'Unknown',
+            'icon': row.category_icon or '❓'
+        } if row.category_id else {'id': None, 'name': 'Unknown', 'icon': '❓'},
+        'difficulty': row.difficulty or 'Medium',
+        'description': row.description or 'No description available',
+        'timeLimit': row.time_limit or 15,
+        'isPublic': row.is_active,
+        'rating': 4.0,
+        'totalRatings': 0
+    }
+
+# Sort options for the catalog: (sort column, descending?)
+CATALOG_SORTS = {
+    'newest': ('created_at', True),
+    'oldest': ('created_at', False),
+    'title': ('title', False),
+}
+CATALOG_DEFAULT_LIMIT = 20
+CATALOG_MAX_LIMIT = 100
+
+def encode_cursor(values):
+    """Encode keyset values as an opaque, URL-safe cursor string."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor(); raises ValueError if malformed."""
     try:
-        n = len(items)
-        if n <= 1:
-            return items
-        rng = CustomRandom()  # Initialize custom random number generator
-        for i in range(n - 1, -1, -1):
-            j = rng.next(0, i)  # Get random index from 0 to i
-            items[i], items[j] = items[j], items[i]  # Swap elements
-        return items
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
     except Exception as e:
-        print(f"[{datetime.now()}] Error in custom_shuffle: {str(e)}")
-        raise
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if not isinstance(values, list):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return values
+
+def order_catalog(query, sort):
+    """Order the catalog by (sort column, id); quizzes without created_at come last either way."""
+    column_name, descending = CATALOG_SORTS[sort]
+    column = getattr(Quiz, column_name)
+    if descending:
+        # NULLs sort last in descending order on MySQL and SQLite
+        return query.order_by(column.desc(), Quiz.id.desc())
+    if Quiz.__table__.c[column_name].nullable:
+        query = query.order_by(column.is_(None))
+    return query.order_by(column.asc(), Quiz.id.asc())
+
+def apply_catalog_keyset(query, sort, cursor, limit):
+    """Order the catalog and seek past the cursor row, fetching one extra row.
+
+    Cursors carry the sort they were issued for; reusing one with another sort raises ValueError.
+    """
+    column_name, descending = CATALOG_SORTS[sort]
+    column = getattr(Quiz, column_name)
+    if cursor:
+        cursor_sort, last_value, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError(f'Cursor was issued for sort {cursor_sort!r}, not {sort!r}')
+        if last_value is not None and column_name == 'created_at':
+            last_value = datetime.fromisoformat(last_value)
+        if last_value is None:
+            query = query.filter(column.is_(None), Quiz.id < last_id if descending else Quiz.id > last_id)
+        elif descending:
+            query = query.filter(or_(column < last_value, and_(column == last_value, Quiz.id < last_id), column.is_(None)))
+        else:
+            query = query.filter(or_(column > last_value, and_(column == last_value, Quiz.id > last_id), column.is_(None)))
+    return order_catalog(query, sort).limit(limit + 1)
 
 @quiz_bp.route('/quizzes', methods=['GET'])
 @jwt_required()
 def get_quizzes():
-    """Fetch quizzes filtered by category_id for authenticated users."""
+    """Fetch quizzes for authenticated users, optionally filtered, sorted and keyset-paginated.
+
+    Query params: category_id, difficulty, q (title prefix), sort (newest|oldest|title),
+    limit and cursor. Passing limit or cursor returns a page envelope with nextCursor;
+    otherwise the full filtered list is returned as before.
+    """
     try:
         user_id = get_jwt_identity()
         claims = get_jwt()
@@ -66,43 +131,147 @@ def get_quizzes():
             return jsonify({'message': 'Unauthorized access'}), 403
 
         category_id = request.args.get('category_id')
-        print(f"[{datetime.now()}] Requested category_id: {category_id}")
-        query = Quiz.query.filter_by(is_active=True)
+        difficulty = request.args.get('difficulty')
+        title_prefix = (request.args.get('q') or '').strip()
+        sort = request.args.get('sort', 'newest')
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        paginate = cursor is not None or limit is not None
+        print(f"[{datetime.now()}] Requested category_id: {category_id}, difficulty: {difficulty}, q: {title_prefix}, sort: {sort}, cursor: {cursor}, limit: {limit}")
+
+        query = catalog_query()
         if category_id:
             try:
                 category_id = int(category_id)  # Convert to integer to match database
-                query = query.filter_by(category_id=category_id)
+                query = query.filter(Quiz.category_id == category_id)
                 print(f"[{datetime.now()}] Filtering quizzes with category_id: {category_id}")
             except ValueError:
                 print(f"[{datetime.now()}] Invalid category_id format: {category_id}")
                 return jsonify({'message': 'Invalid category_id format'}), 400
-
-        quizzes = query.all()
-        print(f"[{datetime.now()}] Found {len(quizzes)} quizzes: {[q.id for q in quizzes]}")
-        if not quizzes:
-            print(f"[{datetime.now()}] No quizzes found for category_id: {category_id}")
-            return jsonify({'message': 'No quizzes found for this category'}), 200
-
-        return jsonify([{
-            'id': str(quiz.id),
-            'title': quiz.title or 'Unnamed Quiz',
-            'category': {
-                'id': str(category_id) if quiz.category_id else None,
-                'name': quiz.category.name if quiz.category else 'Unknown',
-                'icon': quiz.category.icon if quiz.category else '❓'
-            } if quiz.category_id else {'id': None, 'name': 'Unknown', 'icon': '❓'},
-            'difficulty': quiz.difficulty or 'Medium',
-            'description': quiz.description or 'No description available',
-            'timeLimit': quiz.time_limit or 15,
-            'isPublic': quiz.is_active,
-            'rating': 4.0,
-            'totalRatings': 0
-        } for quiz in quizzes]), 200
+        if difficulty:
+            if difficulty not in ['easy', 'medium', 'hard']:
+                return jsonify({'message': 'Invalid difficulty level'}), 400
+            query = query.filter(Quiz.difficulty == difficulty)
+        if title_prefix:
+            escaped = title_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(Quiz.title.like(f'{escaped}%', escape='\\'))
+        if sort not in CATALOG_SORTS:
+            return jsonify({'message': f"Invalid sort option, expected one of: {', '.join(CATALOG_SORTS)}"}), 400
+
+        if not paginate:
+            rows = order_catalog(query, sort).all()
+            print(f"[{datetime.now()}] Found {len(rows)} quizzes")
+            if not rows:
+                print(f"[{datetime.now()}] No quizzes found for category_id: {category_id}")
+                return jsonify({'message': 'No quizzes found for this category'}), 200
+            return jsonify([serialize_catalog_row(row) for row in rows]), 200
+
+        limit = max(1, min(limit or CATALOG_DEFAULT_LIMIT, CATALOG_MAX_LIMIT))
+        try:
+            rows = apply_catalog_keyset(query, sort, cursor, limit).all()
+        except (ValueError, TypeError) as e:
+            print(f"[{datetime.now()}] {str(e)}")
+            return jsonify({'message': 'Invalid cursor'}), 400
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            column_name, _ = CATALOG_SORTS[sort]
+            last_value = getattr(last, column_name)
+            if column_name == 'created_at' and last_value is not None:
+                last_value = last_value.isoformat()
+            next_cursor = encode_cursor([sort, last_value, last.id])
+        print(f"[{datetime.now()}] Returning catalog page with {len(rows)} quizzes, next cursor: {next_cursor}")
+        return jsonify({
+            'quizzes': [serialize_catalog_row(row) for row in rows],
+            'nextCursor': next_cursor,
+            'limit': limit,
+            'sort': sort
+        }), 200
     except Exception as e:
         print(f"[{datetime.now()}] Error in get_quizzes: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'message': f'Internal server error: {str(e)}'}), 500
 
+def map_question(q):
+    """Validate a Question/StandaloneQuestion row and map it to the play payload format."""
+    options = q.options if q.options and isinstance(q.options, (list, tuple)) else []
+    return {
+        'id': str(q.id),
+        'question': q.question if q.question and q.question.strip() else f"Question {q.id} (Text Missing)",
+        'type': q.question_type if q.question_type else 'multiple_choice',
+        'options': [
+            {'id': idx + 1, 'option_text': opt, 'is_correct': opt == q.answer}
+            for idx, opt in enumerate(options)
+        ],
+        'answer': q.answer if q.answer else '',
+        'explanation': q.explanation if q.explanation else 'No explanation provided.'
+    }
+
+def map_questions(questions):
+    """Map questions in canonical (ascending id) order, which the seeded shuffle relies on."""
+    mapped_questions = []
+    for q in sorted(questions, key=lambda q: q.id):
+        try:
+            mapped_questions.append(map_question(q))
+        except Exception as e:
+            print(f"[{datetime.now()}] Error processing question ID {q.id}: {str(e)}")
+            continue
+    return mapped_questions
+
+def prepare_quiz_payload(quiz_id):
+    """Load a quiz and its validated question list for quiz_payload_cache.
+
+    Returns (payload, cacheable); payload is None when the quiz does not exist.
+    """
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return None, False
+
+    questions = Question.query.filter_by(quiz_id=quiz_id).all()
+    print(f"[{datetime.now()}] Found {len(questions)} questions for quiz_id {quiz_id}: {[q.id for q in questions]}")
+    cacheable = True
+    if not questions:
+        print(f"[{datetime.now()}] No records in Question table for quiz_id {quiz_id}")
+        questions = [
+            Question(
+                id=22,
+                quiz_id=quiz_id,
+                question="What is the capital of Nepal?",
+                question_type="multiple_choice",
+                options=["Kathmandu", "Pokhara", "Biratnagar", "Lalitpur"],
+                answer="Kathmandu",
+                explanation="Kathmandu is the capital of Nepal."
+            ),
+            Question(
+                id=23,
+                quiz_id=quiz_id,
+                question="What is 2 + 2?",
+                question_type="multiple_choice",
+                options=["3", "4", "5", "6"],
+                answer="4",
+                explanation="2 + 2 equals 4."
+            )
+        ]
+        print(f"[{datetime.now()}] Using hardcoded questions as fallback: {[q.id for q in questions]}")
+        cacheable = False  # Don't pin the placeholder questions in the cache
+
+    return {
+        'id': str(quiz.id),
+        'title': quiz.title,
+        'category': {
+            'id': str(quiz.category_id),
+            'name': quiz.category.name if quiz.category else 'Unknown',
+            'icon': quiz.category.icon if quiz.category else '❓'
+        },
+        'difficulty': quiz.difficulty,
+        'description': quiz.description,
+        'timeLimit': quiz.time_limit,
+        'isPublic': quiz.is_active,
+        'questions': map_questions(questions)
+    }, cacheable
+
 @quiz_bp.route('/quizzes/<int:quiz_id>', methods=['GET'])
 @jwt_required()
 def get_quiz(quiz_id):
@@ -115,75 +284,26 @@ def get_quiz(quiz_id):
         if role not in ['admin', 'user']:
             return jsonify({'message': 'Unauthorized access'}), 403
 
-        quiz = Quiz.query.get_or_404(quiz_id)
-        if not quiz.is_active:
+        prepared = quiz_payload_cache.get_or_load(quiz_id, prepare_quiz_payload)
+        if prepared is None:
+            return jsonify({'message': 'Quiz not found'}), 404
+        if not prepared['isPublic']:
             return jsonify({'message': 'Quiz is not active'}), 403
 
         mode = request.args.get('mode', 'standard')
-        questions = Question.query.filter_by(quiz_id=quiz_id).all()
-        print(f"[{datetime.now()}] Found {len(questions)} questions for quiz_id {quiz_id}: {[q.id for q in questions]}")
-
-        if not questions:
-            print(f"[{datetime.now()}] No questions found for quiz_id {quiz_id}, checking database state...")
-            count = db.session.query(Question).filter_by(quiz_id=quiz_id).count()
-            if count == 0:
-                print(f"[{datetime.now()}] No records in Question table for quiz_id {quiz_id}")
-                questions = [
-                    Question(
-                        id=22,
-                        quiz_id=quiz_id,
-                        question="What is the capital of Nepal?",
-                        question_type="multiple_choice",
-                        options=["Kathmandu", "Pokhara", "Biratnagar", "Lalitpur"],
-                        answer="Kathmandu",
-                        explanation="Kathmandu is the capital of Nepal."
-                    ),
-                    Question(
-                        id=23,
-                        quiz_id=quiz_id,
-                        question="What is 2 + 2?",
-                        question_type="multiple_choice",
-                        options=["3", "4", "5", "6"],
-                        answer="4",
-                        explanation="2 + 2 equals 4."
-                    )
-                ]
-                print(f"[{datetime.now()}] Using hardcoded questions as fallback: {[q.id for q in questions]}")
-            else:
-                print(f"[{datetime.now()}] Query returned 0 results but {count} records exist, potential mapping issue")
-                return jsonify({'message': 'Error fetching questions'}), 500
-
-        mapped_questions = []
-        for q in questions:
-            try:
-                options = q.options if q.options and isinstance(q.options, (list, tuple)) else []
-                mapped_questions.append({
-                    'id': str(q.id),
-                    'question': q.question if q.question and q.question.strip() else f"Question {q.id} (Text Missing)",
-                    'type': q.question_type if q.question_type else 'multiple_choice',
-                    'options': [
-                        {'id': idx + 1, 'option_text': opt, 'is_correct': opt == q.answer}
-                        for idx, opt in enumerate(options)
-                    ],
-                    'answer': q.answer if q.answer else '',
-                    'explanation': q.explanation if q.explanation else 'No explanation provided.'
-                })
-            except Exception as e:
-                print(f"[{datetime.now()}] Error processing question ID {q.id}: {str(e)}")
-                continue
-
-        if not mapped_questions:
+        if not prepared['questions']:
             print(f"[{datetime.now()}] No valid questions could be processed for quiz_id {quiz_id}")
             return jsonify({'message': 'No valid questions available'}), 200
 
-        custom_shuffle(mapped_questions)  # Custom shuffle for question order
+        # One seed per attempt drives every question/option permutation; it is returned so the
+        # presented order can be rebuilt from the canonical question list at submit time
+        shuffle_seed = new_attempt_seed()
+        mapped_questions = shuffle_questions(prepared['questions'], shuffle_seed)
         for q in mapped_questions:
-            if q['options']:
-                custom_shuffle(q['options'])  # Custom shuffle for option order
-            else:
+            if not q['options']:
                 print(f"[{datetime.now()}] Question {q['id']} has no options: {q['question']}")
 
-        time_limit = quiz.time_limit if quiz.time_limit is not None else 15
+        time_limit = prepared['timeLimit'] if prepared['timeLimit'] is not None else 15
         if mode == 'rapidfire':
             time_limit = 10
         elif mode == 'timefree':
@@ -191,21 +311,7 @@ def get_quiz(quiz_id):
         elif mode in ['hardmode', 'multiplayer']:
             time_limit = 15
 
-        response = {
-            'id': str(quiz.id),
-            'title': quiz.title,
-            'category': {
-                'id': str(quiz.category_id),
-                'name': quiz.category.name if quiz.category else 'Unknown',
-                'icon': quiz.category.icon if quiz.category else '❓'
-            },
-            'difficulty': quiz.difficulty,
-            'description': quiz.description,
-            'timeLimit': time_limit,
-            'isPublic': quiz.is_active,
-            'questions': mapped_questions,
-            'mode': mode
-        }
+        response = dict(prepared, timeLimit=time_limit, questions=mapped_questions, mode=mode, shuffleSeed=shuffle_seed)
         print(f"[{datetime.now()}] Returning quiz response: {response['id']}, questions: {len(mapped_questions)}")
         return jsonify(response), 200
     except Exception as e:
@@ -213,6 +319,37 @@ def get_quiz(quiz_id):
         print(traceback.format_exc())
         return jsonify({'message': 'Internal server error'}), 500
 
+@quiz_bp.route('/quizzes/<int:quiz_id>/analytics', methods=['GET'])
+@jwt_required()
+def get_quiz_analytics(quiz_id):
+    """Per-question attempt count, correct rate, discrimination and option picks for one quiz (admin only)."""
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'admin':
+            return jsonify({'message': 'Admin access required'}), 403
+
+        quiz = Quiz.query.get(quiz_id)
+        if quiz is None:
+            return jsonify({'message': 'Quiz not found'}), 404
+        questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.id).all()
+        question_stats = read_question_stats(quiz_id)
+        result = []
+        for q in questions:
+            options = q.options if isinstance(q.options, list) else []
+            result.append({
+                'id': q.id,
+                'question': q.question,
+                'options': options,
+                'answer': q.answer,
+                'stats': summarize_question(question_stats.get(q.id, []), len(options))
+            })
+        print(f"[{datetime.now()}] Returning analytics for quiz {quiz_id}: {len(result)} questions")
+        return jsonify({'quizId': quiz.id, 'title': quiz.title, 'questions': result}), 200
+    except Exception as e:
+        print(f"[{datetime.now()}] Error in get_quiz_analytics: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'message': f'Internal server error: {str(e)}'}), 500
+
 @quiz_bp.route('/quizzes', methods=['POST'])
 @jwt_required()
 def create_quiz():
@@ -277,6 +414,10 @@ def create_quiz():
             db.session.add(question)
 
         db.session.commit()
+        search_index.upsert_quiz(new_quiz)
+        answer_key_index.invalidate_quiz(new_quiz.id)
+        quiz_payload_cache.invalidate(new_quiz.id)
+        category_list_cache.clear()  # Quiz counts changed
         print(f"[{datetime.now()}] Quiz created with ID: {new_quiz.id}")
         return jsonify({'message': 'Quiz created successfully', 'id': str(new_quiz.id)}), 201
     except Exception as e:
@@ -285,6 +426,55 @@ def create_quiz():
         print(traceback.format_exc())
         return jsonify({'message': f'Internal server error: {str(e)}'}), 500
 
+def dynamic_time_limit(mode):
+    """Per-question time limit (seconds) for a dynamic quiz mode."""
+    time_limit = 15
+    if mode == 'rapidfire':
+        time_limit = 10
+    elif mode == 'timefree':
+        time_limit = 0
+    elif mode in ['hardmode', 'multiplayer']:
+        time_limit = 15
+    return time_limit
+
+def build_dynamic_payload(mode, questions, category=None):
+    """Map and shuffle sampled StandaloneQuestion rows into a dynamic quiz payload (None if none are valid)."""
+    question_list = map_questions(questions)
+    if not question_list:
+        return None
+
+    shuffle_seed = new_attempt_seed()
+    question_list = shuffle_questions(question_list, shuffle_seed)
+    for q in question_list:
+        if not q['options']:
+            print(f"[{datetime.now()}] Question {q['id']} has no options: {q['question']}")
+
+    return {
+        'id': 'dynamic',
+        'title': f'Dynamic {mode.capitalize()} Quiz',
+        'category': {'id': str(category.id), 'name': category.name, 'icon': category.icon} if category else {'id': 'all', 'name': 'All Categories', 'icon': '🎲'},
+        'difficulty': 'medium',
+        'description': f'A randomly generated quiz with {len(question_list)} questions',
+        'timeLimit': dynamic_time_limit(mode),
+        'isPublic': True,
+        'questions': question_list,
+        'mode': mode,
+        'shuffleSeed': shuffle_seed,
+    }
+
+def prefetch_dynamic_payload(mode, num_questions):
+    """Builder for dynamic_quiz_buffer: an all-categories payload, or None if the bank is too small."""
+    if question_sampler.size() < num_questions:
+        return None
+    return build_dynamic_payload(mode, question_sampler.sample_questions(num_questions))
+
+def record_seen(user_id, question_ids, reset=False, reset_ids=None):
+    try:
+        seen_question_tracker.mark_seen(int(user_id), question_ids, reset=reset, reset_ids=reset_ids)
+    except Exception as e:
+        db.session.rollback()
+        print(f"[{datetime.now()}] Failed to record seen questions for user {user_id}: {str(e)}")
+
 @quiz_bp.route('/quizzes/dynamic', methods=['GET'])
 @jwt_required()
 def get_dynamic_quiz():
@@ -306,73 +496,72 @@ def get_dynamic_quiz():
             print(f"[{datetime.now()}] Invalid num_questions: {num_questions}")
             return jsonify({'message': 'Number of questions must be at least 1'}), 400
 
-        query = StandaloneQuestion.query
-        if category_id:
-            print(f"[{datetime.now()}] Category filtering requested (category_id: {category_id}), but StandaloneQuestion lacks category_id field.")
+        category = None
+        if category_id and category_id != 'all':
+            try:
+                category_id = int(category_id)
+            except ValueError:
+                print(f"[{datetime.now()}] Invalid category_id format: {category_id}")
+                return jsonify({'message': 'Invalid category_id format'}), 400
+            category = Category.query.get(category_id)
+            if not category:
+                return jsonify({'message': 'Category not found'}), 404
+        else:
+            category_id = None
 
-        questions = query.all()
-        print(f"[{datetime.now()}] Total questions found in StandaloneQuestion: {len(questions)}")
-        if not questions or len(questions) < num_questions:
-            print(f"[{datetime.now()}] Insufficient questions: found {len(questions)} but needed {num_questions}")
+        # Players skip questions they were recently served; once the pool runs dry a new cycle starts for it
+        seen = seen_question_tracker.get(int(user_id)) if role == 'user' else None
+
+        # Rapid-fire/multiplayer all-category quizzes come pre-built from the producer's ring buffer
+        if category is None and dynamic_quiz_buffer.handles(mode):
+            ready = dynamic_quiz_buffer.pop(mode, num_questions, exclude=seen)
+            if ready:
+                question_ids, body = ready
+                if seen is not None:
+                    record_seen(user_id, question_ids)
+                print(f"[{datetime.now()}] Returning pre-built dynamic {mode} quiz with {len(question_ids)} questions")
+                return current_app.response_class(body, mimetype='application/json'), 200
+
+        pool_size = question_sampler.size(category_id)
+        print(f"[{datetime.now()}] Questions in sampler pool for category {category_id or 'all'}: {pool_size}")
+        if pool_size < num_questions:
+            print(f"[{datetime.now()}] Insufficient questions: found {pool_size} but needed {num_questions}")
             return jsonify({'message': 'Insufficient questions available'}), 200
 
-        selected_questions = random.sample(questions, min(num_questions, len(questions)))
+        selected_questions = question_sampler.sample_questions(num_questions, category_id, exclude=seen)
+        new_cycle = False
+        if seen is not None and len(selected_questions) < num_questions:
+            # Every unseen question of this pool is already in the quiz; top up from seen ones
+            picked = {q.id for q in selected_questions}
+            selected_questions += question_sampler.sample_questions(num_questions - len(selected_questions), category_id, exclude=picked)
+            new_cycle = True
 
-        question_list = []
-        for q in selected_questions:
-            try:
-                options = q.options if q.options and isinstance(q.options, (list, tuple)) else []
-                question_list.append({
-                    'id': str(q.id),
-                    'question': q.question if q.question and q.question.strip() else f"Question {q.id} (Text Missing)",
-                    'type': q.question_type if q.question_type else 'multiple_choice',
-                    'options': [
-                        {'id': idx + 1, 'option_text': opt, 'is_correct': opt == q.answer}
-                        for idx, opt in enumerate(options)
-                    ],
-                    'answer': q.answer if q.answer else '',
-                    'explanation': q.explanation if q.explanation else 'No explanation provided.'
-                })
-            except Exception as e:
-                print(f"[{datetime.now()}] Error processing question ID {q.id}: {str(e)}")
-                continue
-
-        if not question_list:
+        payload = build_dynamic_payload(mode, selected_questions, category)
+        if payload is None:
             print(f"[{datetime.now()}] No valid questions could be processed")
             return jsonify({'message': 'No valid questions available'}), 200
 
-        custom_shuffle(question_list)  # Custom shuffle for question order
-        for q in question_list:
-            if q['options']:
-                custom_shuffle(q['options'])  # Custom shuffle for option order
-            else:
-                print(f"[{datetime.now()}] Question {q['id']} has no options: {q['question']}")
-
-        time_limit = 15
-        if mode == 'rapidfire':
-            time_limit = 10
-        elif mode == 'timefree':
-            time_limit = 0
-        elif mode in ['hardmode', 'multiplayer']:
-            time_limit = 15
+        if seen is not None:
+            # Only the exhausted pool starts over; other categories keep their seen questions
+            reset_ids = question_sampler.pool_ids(category_id) if new_cycle and category_id is not None else None
+            record_seen(user_id, [q.id for q in selected_questions], reset=new_cycle, reset_ids=reset_ids)
 
-        print(f"[{datetime.now()}] Returning dynamic quiz with {len(question_list)} questions")
-        return jsonify({
-            'id': 'dynamic',
-            'title': f'Dynamic {mode.capitalize()} Quiz',
-            'category': {'id': category_id or 'all', 'name': 'All Categories', 'icon': '🎲'},
-            'difficulty': 'medium',
-            'description': f'A randomly generated quiz with {len(question_list)} questions',
-            'timeLimit': time_limit,
-            'isPublic': True,
-            'questions': question_list,
-            'mode': mode,
-        }), 200
+        print(f"[{datetime.now()}] Returning dynamic quiz with {len(payload['questions'])} questions")
+        return jsonify(payload), 200
     except Exception as e:
         print(f"[{datetime.now()}] Error in get_dynamic_quiz: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'message': 'Internal server error'}), 500
 
+@quiz_bp.route('/quizzes/dynamic/stats', methods=['GET'])
+@jwt_required()
+def get_dynamic_quiz_stats():
+    """Hit/miss counters and fill levels of the pre-built dynamic quiz buffers (admin only)."""
+    claims = get_jwt()
+    if claims.get('role') != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    return jsonify(dynamic_quiz_buffer.stats()), 200
+
 @quiz_bp.route('/quizzes/submit', methods=['POST'])
 @jwt_required()
 def submit_quiz():
@@ -415,39 +604,10 @@ def submit_quiz():
         else:
             quiz_id = None
 
-        correct_count = 0
-        processed_questions = 0
-        for answer in answers:
-            question_id = answer.get('question_id')
-            user_option_id = answer.get('option_id')
-
-            if not question_id:
-                print(f"[{datetime.now()}] Skipping answer due to missing question_id")
-                continue
-
-            try:
-                question_id = int(question_id)
-            except (ValueError, TypeError) as e:
-                print(f"[{datetime.now()}] Invalid question_id format: {question_id}, error: {e}")
-                continue
-
-            question = StandaloneQuestion.query.get(question_id) if is_dynamic else Question.query.get(question_id)
-            if not question:
-                print(f"[{datetime.now()}] Question not found: {question_id}")
-                continue
-
-            if not question.options or not isinstance(question.options, (list, tuple)):
-                print(f"[{datetime.now()}] Invalid or empty options for question {question_id}")
-                continue
-
-            processed_questions += 1
-            correct_option = next((opt for idx, opt in enumerate(question.options) if opt == question.answer), None)
-            if user_option_id is not None and 1 <= user_option_id <= len(question.options):
-                user_selected_option = question.options[user_option_id - 1]
-                if correct_option and user_selected_option == correct_option:
-                    correct_count += 1
-            else:
-                print(f"[{datetime.now()}] Invalid or missing option_id {user_option_id} for question {question_id}, options length: {len(question.options)}")
+        # Grade against the in-memory answer-key index; only cold keys hit the database (one query)
+        parsed_answers = parse_answers(answers)
+        answer_keys = answer_key_index.keys_for({question_id for question_id, _ in parsed_answers}, is_dynamic, quiz_id)
+        correct_count, processed_questions, graded = grade_answers(parsed_answers, answer_keys)
 
         total_questions = max(processed_questions, total_questions) if processed_questions > 0 else total_questions
         score = int((correct_count / total_questions) * 100) if total_questions > 0 else 0
@@ -459,32 +619,26 @@ def submit_quiz():
             print(f"[{datetime.now()}] Invalid datetime format: {ve}")
             return jsonify({'message': 'Invalid date format'}), 400
 
-        query = db.session.query(func.count(QuizHistory.id)).filter_by(user_id=user_id, quiz_id=quiz_id)
-        if category_id and hasattr(QuizHistory, 'category_id'):
-            try:
-                category_id = int(category_id) if category_id else None
-                query = query.filter_by(category_id=category_id)
-            except (ValueError, TypeError):
-                print(f"[{datetime.now()}] Invalid category_id format: {category_id}")
-                category_id = None
-        else:
+        try:
+            category_id = int(category_id) if category_id else None
+        except (ValueError, TypeError):
+            print(f"[{datetime.now()}] Invalid category_id format: {category_id}")
             category_id = None
-        attempt_number = query.scalar() + 1
+        attempt_number = claim_attempt_numbers(user_id, quiz_id, category_id)
 
-        history_entry = QuizHistory(
-            user_id=user_id,
-            quiz_id=quiz_id,
-            category_id=category_id,
-            score=score,
-            total_questions=total_questions,
-            time_taken=time_taken,
-            attempt_number=attempt_number,
-            started_at=started_at_dt,
-            completed_at=completed_at_dt,
-            status='completed'
-        )
-        db.session.add(history_entry)
-        db.session.commit()
+        # Written inline or through the write-behind queue, depending on HISTORY_WRITE_MODE
+        history_writer.write({
+            'user_id': int(user_id),
+            'quiz_id': quiz_id,
+            'category_id': category_id,
+            'score': score,
+            'total_questions': total_questions,
+            'time_taken': time_taken,
+            'attempt_number': attempt_number,
+            'started_at': started_at_dt,
+            'completed_at': completed_at_dt,
+            'status': 'completed'
+        }, user_answer_rows(user_id, quiz_id, graded, completed_at_dt))
 
         print(f"[{datetime.now()}] Quiz attempt saved for user {user_id}, quiz_id: {quiz_id or 'dynamic'}, category_id: {category_id}, score: {score}, correct: {correct_count}/{total_questions}")
         return jsonify({
@@ -499,10 +653,398 @@ def submit_quiz():
         print(traceback.format_exc())
         return jsonify({'message': f'Internal server error: {str(e)}'}), 500
 
+BULK_SUBMIT_MAX_ATTEMPTS = 500
+
+def parse_iso_datetime(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def parse_attempt(attempt):
+    """Validate one attempt of a batch payload; returns (fields, error_message)."""
+    if not isinstance(attempt, dict):
+        return None, 'Attempt must be an object'
+    answers = attempt.get('answers')
+    time_taken = attempt.get('time_taken')
+    total_questions = attempt.get('total_questions')
+    if not all([answers, time_taken is not None, attempt.get('started_at'), attempt.get('completed_at'), total_questions]):
+        return None, 'Missing required fields'
+    try:
+        started_at_dt = parse_iso_datetime(attempt['started_at'])
+        completed_at_dt = parse_iso_datetime(attempt['completed_at'])
+    except (ValueError, AttributeError):
+        return None, 'Invalid date format'
+    return {
+        'answers': parse_answers(answers),
+        'time_taken': time_taken,
+        'total_questions': total_questions,
+        'started_at': started_at_dt,
+        'completed_at': completed_at_dt
+    }, None
+
+def attempt_score(correct_count, processed, total_questions):
+    """(total_questions, score) for a graded attempt, with the same rules as submit_quiz."""
+    total_questions = max(processed, total_questions) if processed > 0 else total_questions
+    return total_questions, int((correct_count / total_questions) * 100) if total_questions > 0 else 0
+
+@quiz_bp.route('/quizzes/submit/bulk', methods=['POST'])
+@jwt_required()
+def submit_quiz_bulk():
+    """Grade many attempts of one quiz together (classroom runs, offline queues).
+
+    Admins submit on behalf of users (each attempt carries user_id); users can only submit
+    their own attempts. Attempts are scored as one matrix against the answer-key index and
+    written with a single bulk insert. Invalid attempts are reported per index and skipped.
+    """
+    try:
+        user_id = get_jwt_identity()
+        claims = get_jwt()
+        role = claims.get('role')
+        print(f"[{datetime.now()}] Authenticated user ID: {user_id}, Role: {role}")
+
+        if role not in ['admin', 'user']:
+            return jsonify({'message': 'Unauthorized access'}), 403
+
+        data = request.get_json() or {}
+        quiz_id = data.get('quiz_id')
+        category_id = data.get('category_id')
+        attempts = data.get('attempts')
+
+        if not quiz_id or not isinstance(attempts, list) or not attempts:
+            return jsonify({'message': 'quiz_id and a non-empty attempts list are required'}), 400
+        if len(attempts) > BULK_SUBMIT_MAX_ATTEMPTS:
+            return jsonify({'message': f'At most {BULK_SUBMIT_MAX_ATTEMPTS} attempts per request'}), 400
+
+        is_dynamic = quiz_id == 'dynamic'
+        if not is_dynamic:
+            try:
+                quiz_id = int(quiz_id)
+            except (ValueError, TypeError):
+                print(f"[{datetime.now()}] Invalid quiz_id format: {quiz_id}")
+                return jsonify({'message': 'Invalid quiz_id format'}), 400
+            quiz = Quiz.query.get(quiz_id)
+            if quiz is None:
+                return jsonify({'message': 'Quiz not found'}), 404
+            if not quiz.is_active:
+                print(f"[{datetime.now()}] Quiz {quiz_id} is not active")
+                return jsonify({'message': 'Quiz is not active'}), 403
+        else:
+            quiz_id = None
+
+        try:
+            category_id = int(category_id) if category_id else None
+        except (ValueError, TypeError):
+            print(f"[{datetime.now()}] Invalid category_id format: {category_id}")
+            category_id = None
+
+        # Validate attempts up front; failures are reported without aborting the batch
+        accepted, errors = [], []
+        for idx, attempt in enumerate(attempts):
+            fields, error = parse_attempt(attempt)
+            if error:
+                errors.append({'index': idx, 'message': error})
+                continue
+            if role == 'admin':
+                try:
+                    attempt_user_id = int(attempt.get('user_id'))
+                except (ValueError, TypeError):
+                    errors.append({'index': idx, 'message': 'user_id is required for admin submissions'})
+                    continue
+            else:
+                attempt_user_id = int(user_id)
+            accepted.append(dict(fields, index=idx, user_id=attempt_user_id))
+
+        if role == 'admin' and accepted:
+            known_users = {row.id for row in db.session.query(User.id).filter(User.id.in_({a['user_id'] for a in accepted}))}
+            for attempt in accepted:
+                if attempt['user_id'] not in known_users:
+                    errors.append({'index': attempt['index'], 'message': f"User {attempt['user_id']} not found"})
+            accepted = [a for a in accepted if a['user_id'] in known_users]
+
+        if not accepted:
+            return jsonify({'message': 'No valid attempts', 'results': [], 'errors': errors}), 400
+
+        # Score all attempts as one matrix over the union of answered questions
+        question_ids = {question_id for attempt in accepted for question_id, _ in attempt['answers']}
+        answer_keys = answer_key_index.keys_for(question_ids, is_dynamic, quiz_id)
+        correct_counts, processed_counts, graded = grade_attempt_matrix([a['answers'] for a in accepted], answer_keys)
+
+        # Reserve a block of attempt numbers per user, handed out in submission order
+        attempts_per_user = {}
+        for attempt in accepted:
+            attempts_per_user[attempt['user_id']] = attempts_per_user.get(attempt['user_id'], 0) + 1
+        next_attempt = {
+            attempt_user_id: claim_attempt_numbers(attempt_user_id, quiz_id, category_id, count)
+            for attempt_user_id, count in attempts_per_user.items()
+        }
+
+        rows, answer_rows, results = [], [], []
+        for attempt, correct_count, processed, attempt_graded in zip(accepted, correct_counts.tolist(), processed_counts.tolist(), graded):
+            total_questions, score = attempt_score(correct_count, processed, attempt['total_questions'])
+            answer_rows.append(user_answer_rows(attempt['user_id'], quiz_id, attempt_graded, attempt['completed_at']))
+            attempt_number = next_attempt[attempt['user_id']]
+            next_attempt[attempt['user_id']] += 1
+            rows.append({
+                'user_id': attempt['user_id'],
+                'quiz_id': quiz_id,
+                'category_id': category_id,
+                'score': score,
+                'total_questions': total_questions,
+                'time_taken': attempt['time_taken'],
+                'attempt_number': attempt_number,
+                'started_at': attempt['started_at'],
+                'completed_at': attempt['completed_at'],
+                'status': 'completed'
+            })
+            results.append({
+                'index': attempt['index'],
+                'user_id': attempt['user_id'],
+                'score': score,
+                'correct_answers': correct_count,
+                'total_questions': total_questions
+            })
+
+        insert_attempts(rows, answer_rows)
+        db.session.commit()
+        attempts_committed(rows)
+
+        print(f"[{datetime.now()}] Bulk submit saved {len(rows)} attempts for quiz_id: {quiz_id or 'dynamic'}, rejected {len(errors)}")
+        return jsonify({
+            'message': 'Quiz attempts submitted successfully',
+            'results': results,
+            'errors': errors
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        print(f"[{datetime.now()}] Error in submit_quiz_bulk: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'message': f'Internal server error: {str(e)}'}), 500
+
+SYNC_MAX_KEY_LENGTH = 64
+
+def stored_attempt_result(entry):
+    return {
+        'historyId': entry.id,
+        'quizId': str(entry.quiz_id) if entry.quiz_id else 'dynamic',
+        'score': entry.score,
+        'total_questions': entry.total_questions,
+        'attempt_number': entry.attempt_number
+    }
+
+@quiz_bp.route('/quizzes/sync', methods=['POST'])
+@jwt_required()
+def sync_quiz_attempts():
+    """Upload attempts queued by an offline client in one request.
+
+    Each attempt carries a client-generated idempotency_key. Keys already stored for the user
+    (found through the unique (user_id, client_attempt_id) index) are returned as duplicates
+    without being graded again, so retrying a sync is a cheap no-op. New attempts are graded
+    per quiz and stored in a single transaction; results are returned per item.
+    """
+    try:
+        user_id = get_jwt_identity()
+        claims = get_jwt()
+        role = claims.get('role')
+        print(f"[{datetime.now()}] Authenticated user ID: {user_id}, Role: {role}")
+
+        if role != 'user':
+            return jsonify({'message': 'Only users can sync quiz attempts'}), 403
+
+        data = request.get_json() or {}
+        attempts = data.get('attempts')
+        if not isinstance(attempts, list) or not attempts:
+            return jsonify({'message': 'A non-empty attempts list is required'}), 400
+        if len(attempts) > BULK_SUBMIT_MAX_ATTEMPTS:
+            return jsonify({'message': f'At most {BULK_SUBMIT_MAX_ATTEMPTS} attempts per request'}), 400
+        user_id = int(user_id)
+
+        results = [None] * len(attempts)
+        first_index = {}
+        for idx, attempt in enumerate(attempts):
+            key = attempt.get('idempotency_key') if isinstance(attempt, dict) else None
+            if not isinstance(key, str) or not key or len(key) > SYNC_MAX_KEY_LENGTH:
+                results[idx] = {'index': idx, 'status': 'error', 'message': f'idempotency_key must be a string of 1-{SYNC_MAX_KEY_LENGTH} characters'}
+            else:
+                first_index.setdefault(key, idx)
+
+        # Graded with the same transaction-wide retry if a concurrent sync stored some keys first
+        for retry in range(2):
+            stored = {
+                entry.client_attempt_id: entry
+                for entry in QuizHistory.query.filter(QuizHistory.user_id == user_id,
+                                                      QuizHistory.client_attempt_id.in_(list(first_index)))
+            } if first_index else {}
+
+            pending = []
+            for key, idx in first_index.items():
+                if key in stored:
+                    results[idx] = dict(stored_attempt_result(stored[key]), index=idx, idempotency_key=key, status='duplicate')
+                    continue
+                attempt = attempts[idx]
+                fields, error = parse_attempt(attempt)
+                if error:
+                    results[idx] = {'index': idx, 'idempotency_key': key, 'status': 'error', 'message': error}
+                    continue
+                quiz_id = attempt.get('quiz_id')
+                category_id = attempt.get('category_id')
+                try:
+                    quiz_id = None if quiz_id == 'dynamic' else int(quiz_id)
+                    category_id = int(category_id) if category_id else None
+                except (ValueError, TypeError):
+                    results[idx] = {'index': idx, 'idempotency_key': key, 'status': 'error', 'message': 'Invalid quiz_id or category_id format'}
+                    continue
+                pending.append(dict(fields, index=idx, key=key, quiz_id=quiz_id, category_id=category_id))
+
+            # Static quizzes must exist and be active; checked with one query
+            quiz_ids = {a['quiz_id'] for a in pending if a['quiz_id'] is not None}
+            active_quizzes = {row.id for row in db.session.query(Quiz.id).filter(Quiz.id.in_(quiz_ids), Quiz.is_active)} if quiz_ids else set()
+            groups = {}
+            for attempt in pending:
+                if attempt['quiz_id'] is not None and attempt['quiz_id'] not in active_quizzes:
+                    results[attempt['index']] = {'index': attempt['index'], 'idempotency_key': attempt['key'], 'status': 'error', 'message': 'Quiz not found or not active'}
+                    continue
+                groups.setdefault(attempt['quiz_id'], []).append(attempt)
+
+            rows, answer_rows, created = [], [], []
+            for quiz_id, group in groups.items():
+                question_ids = {question_id for attempt in group for question_id, _ in attempt['answers']}
+                answer_keys = answer_key_index.keys_for(question_ids, quiz_id is None, quiz_id)
+                correct_counts, processed_counts, graded = grade_attempt_matrix([a['answers'] for a in group], answer_keys)
+
+                per_category = {}
+                for attempt in group:
+                    per_category[attempt['category_id']] = per_category.get(attempt['category_id'], 0) + 1
+                next_attempt = {
+                    category_id: claim_attempt_numbers(user_id, quiz_id, category_id, count)
+                    for category_id, count in per_category.items()
+                }
+
+                for attempt, correct_count, processed, attempt_graded in zip(group, correct_counts.tolist(), processed_counts.tolist(), graded):
+                    total_questions, score = attempt_score(correct_count, processed, attempt['total_questions'])
+                    answer_rows.append(user_answer_rows(user_id, quiz_id, attempt_graded, attempt['completed_at']))
+                    attempt_number = next_attempt[attempt['category_id']]
+                    next_attempt[attempt['category_id']] += 1
+                    rows.append({
+                        'user_id': user_id,
+                        'quiz_id': quiz_id,
+                        'category_id': attempt['category_id'],
+                        'score': score,
+                        'total_questions': total_questions,
+                        'time_taken': attempt['time_taken'],
+                        'attempt_number': attempt_number,
+                        'started_at': attempt['started_at'],
+                        'completed_at': attempt['completed_at'],
+                        'status': 'completed',
+                        'client_attempt_id': attempt['key']
+                    })
+                    created.append((attempt, {
+                        'quizId': str(quiz_id) if quiz_id else 'dynamic',
+                        'score': score,
+                        'correct_answers': correct_count,
+                        'total_questions': total_questions,
+                        'attempt_number': attempt_number
+                    }))
+
+            try:
+                if rows:
+                    insert_attempts(rows, answer_rows)
+                db.session.commit()
+                attempts_committed(rows)
+                break
+            except IntegrityError:
+                # Another sync of the same queue stored some of these keys; resolve them as duplicates
+                db.session.rollback()
+                if retry:
+                    raise
+                print(f"[{datetime.now()}] Concurrent sync detected for user {user_id}, retrying")
+
+        for attempt, result in created:
+            results[attempt['index']] = dict(result, index=attempt['index'], idempotency_key=attempt['key'], status='created')
+        for idx, result in enumerate(results):
+            if result is None:
+                # Repeated key within this request: same outcome as its first occurrence
+                first = results[first_index[attempts[idx]['idempotency_key']]]
+                results[idx] = dict(first, index=idx, status='error' if first['status'] == 'error' else 'duplicate')
+
+        print(f"[{datetime.now()}] Synced {len(created)} new attempts for user {user_id} ({len(attempts)} received)")
+        return jsonify({
+            'message': 'Quiz attempts synced successfully',
+            'created': len(created),
+            'results': results
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        print(f"[{datetime.now()}] Error in sync_quiz_attempts: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'message': f'Internal server error: {str(e)}'}), 500
+
+HISTORY_DEFAULT_LIMIT = 20
+HISTORY_MAX_LIMIT = 100
+
+def history_query(user_id):
+    """A user's history rows with quiz title and category name joined in (no per-row lazy loads)."""
+    return db.session.query(
+        QuizHistory.id,
+        QuizHistory.quiz_id,
+        QuizHistory.category_id,
+        QuizHistory.score,
+        QuizHistory.total_questions,
+        QuizHistory.time_taken,
+        QuizHistory.attempt_number,
+        QuizHistory.started_at,
+        QuizHistory.completed_at,
+        QuizHistory.status,
+        Quiz.title.label('quiz_title'),
+        Category.name.label('category_name')
+    ).outerjoin(Quiz, Quiz.id == QuizHistory.quiz_id
+    ).outerjoin(Category, Category.id == QuizHistory.category_id
+    ).filter(QuizHistory.user_id == user_id)
+
+def history_page(query, cursor, limit):
+    """Newest-first keyset page over (completed_at, id), served by ix_quiz_history_user_completed_id.
+
+    Rows without completed_at sort last, as they do in a descending index scan.
+    Returns (rows, next_cursor); raises ValueError for a malformed cursor.
+    """
+    if cursor:
+        last_completed_at, last_id = decode_cursor(cursor)
+        if last_completed_at is None:
+            query = query.filter(QuizHistory.completed_at.is_(None), QuizHistory.id < last_id)
+        else:
+            last_completed_at = datetime.fromisoformat(last_completed_at)
+            query = query.filter(or_(
+                QuizHistory.completed_at < last_completed_at,
+                and_(QuizHistory.completed_at == last_completed_at, QuizHistory.id < last_id),
+                QuizHistory.completed_at.is_(None)
+            ))
+    rows = query.order_by(QuizHistory.completed_at.desc(), QuizHistory.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.completed_at.isoformat() if last.completed_at else None, last.id])
+    return rows, next_cursor
+
+def serialize_history_row(row):
+    return {
+        'id': row.id,
+        'quizId': str(row.quiz_id) if row.quiz_id else 'dynamic',
+        'title': row.quiz_title or 'Dynamic Quiz',
+        'category': row.category_name or 'All Categories',
+        'color': '#7209b7' if row.category_name else '#666666',
+        'date': row.completed_at.isoformat() if row.completed_at else row.started_at.isoformat(),
+        'score': row.score,
+        'totalQuestions': row.total_questions,
+        'timeTaken': row.time_taken // 60 if row.time_taken else 0,
+        'completed': row.status == 'completed'
+    }
+
 @quiz_bp.route('/history', methods=['GET'])
 @jwt_required()
 def get_quiz_history():
-    """Fetch quiz history for the authenticated user."""
+    """Fetch quiz history for the authenticated user.
+
+    Without `limit`/`cursor` the full history is returned as a list (legacy clients);
+    with them, a keyset page {history, nextCursor, limit} newest first.
+    """
     try:
         user_id = get_jwt_identity()
         claims = get_jwt()
@@ -512,28 +1054,29 @@ def get_quiz_history():
         if role not in ['admin', 'user']:
             return jsonify({'message': 'Unauthorized access'}), 403
 
-        history_entries = QuizHistory.query.filter_by(user_id=user_id).order_by(QuizHistory.completed_at.desc()).all()
-        print(f"[{datetime.now()}] Found {len(history_entries)} history entries for user {user_id}")
-
-        if not history_entries:
-            return jsonify({'message': 'No quiz history found'}), 200
-
-        history_data = [
-            {
-                'id': entry.id,
-                'quizId': str(entry.quiz_id) if entry.quiz_id else 'dynamic',
-                'title': entry.quiz.title if entry.quiz else 'Dynamic Quiz',
-                'category': entry.category.name if entry.category else 'All Categories',
-                'color': '#7209b7' if entry.category else '#666666',
-                'date': entry.completed_at.isoformat() if entry.completed_at else entry.started_at.isoformat(),
-                'score': entry.score,
-                'totalQuestions': entry.total_questions,
-                'timeTaken': entry.time_taken // 60 if entry.time_taken else 0,
-                'completed': entry.status == 'completed'
-            } for entry in history_entries
-        ]
-        print(f"[{datetime.now()}] Returning history data: {[entry['id'] for entry in history_data]}")
-        return jsonify(history_data), 200
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        query = history_query(user_id)
+
+        if limit is None and not cursor:
+            history_entries = query.order_by(QuizHistory.completed_at.desc(), QuizHistory.id.desc()).all()
+            print(f"[{datetime.now()}] Found {len(history_entries)} history entries for user {user_id}")
+            if not history_entries:
+                return jsonify({'message': 'No quiz history found'}), 200
+            return jsonify([serialize_history_row(row) for row in history_entries]), 200
+
+        limit = max(1, min(limit or HISTORY_DEFAULT_LIMIT, HISTORY_MAX_LIMIT))
+        try:
+            rows, next_cursor = history_page(query, cursor, limit)
+        except (ValueError, TypeError) as e:
+            print(f"[{datetime.now()}] {str(e)}")
+            return jsonify({'message': 'Invalid cursor'}), 400
+        print(f"[{datetime.now()}] Returning history page with {len(rows)} entries for user {user_id}, next cursor: {next_cursor}")
+        return jsonify({
+            'history': [serialize_history_row(row) for row in rows],
+            'nextCursor': next_cursor,
+            'limit': limit
+        }), 200
     except Exception as e:
         print(f"[{datetime.now()}] Error in get_quiz_history: {str(e)}")
         print(traceback.format_exc())
@@ -546,7 +1089,7 @@ def get_quiz_history():
 @quiz_bp.route('/standalone-questions', methods=['GET'])
 @jwt_required()
 def get_standalone_questions():
-    """Get all standalone questions for admin management."""
+    """Get all standalone questions for admin management, with their answer statistics."""
     try:
         user_id = get_jwt_identity()
         claims = get_jwt()
@@ -555,7 +1098,12 @@ def get_standalone_questions():
         if role != 'admin':
             return jsonify({'message': 'Only admins can access standalone questions'}), 403
         
-        questions = StandaloneQuestion.query.all()
+        query = StandaloneQuestion.query
+        category_id = request.args.get('category_id', type=int)
+        if category_id:
+            query = query.filter_by(category_id=category_id)
+        questions = query.all()
+        question_stats = read_question_stats(0)
         questions_data = []
         
         for q in questions:
@@ -578,7 +1126,9 @@ def get_standalone_questions():
                 'question_type': q.question_type,
                 'options': options_list,
                 'answer': q.answer,
-                'explanation': q.explanation or ''
+                'explanation': q.explanation or '',
+                'category_id': q.category_id,
+                'stats': summarize_question(question_stats.get(q.id, []), len(options_list))
             })
         
         print(f"[{datetime.now()}] Found {len(questions_data)} standalone questions")
@@ -626,7 +1176,8 @@ def get_standalone_question(question_id):
             'question_type': question.question_type,
             'options': options_formatted,
             'answer': question.answer,
-            'explanation': question.explanation or ''
+            'explanation': question.explanation or '',
+            'category_id': question.category_id
         }
         
         print(f"[{datetime.now()}] Retrieved standalone question {question_id}")
@@ -654,12 +1205,26 @@ def update_standalone_question(question_id):
             return jsonify({"error": "No data provided"}), 400
 
         question = StandaloneQuestion.query.get_or_404(question_id)
+        old_category_id = question.category_id
+        old_key = (list(question.options or []), question.answer)
         
         # Update basic fields
         question.question = data.get('question', question.question).strip()
         question.question_type = data.get('question_type', question.question_type)
         question.answer = data.get('answer', question.answer).strip()
         question.explanation = data.get('explanation', question.explanation or '').strip()
+        if 'category_id' in data:
+            category_id = data['category_id']
+            if category_id in (None, ''):
+                question.category_id = None
+            else:
+                try:
+                    category_id = int(category_id)
+                except (ValueError, TypeError):
+                    return jsonify({"error": "Invalid category_id"}), 400
+                if not Category.query.get(category_id):
+                    return jsonify({"error": "Category not found"}), 400
+                question.category_id = category_id
         
         # Handle options update
         options_data = data.get('options', {})
@@ -692,7 +1257,13 @@ def update_standalone_question(question_id):
             if question.answer not in ['True', 'False']:
                 return jsonify({"error": "Answer must be 'True' or 'False' for true/false questions"}), 400
 
+        if (list(question.options or []), question.answer) != old_key:
+            reset_question_stats(0, question.id)  # Past picks no longer map to these options
         db.session.commit()
+        search_index.upsert_question(question)
+        question_sampler.move(question.id, old_category_id, question.category_id)
+        dynamic_quiz_buffer.clear()
+        answer_key_index.invalidate_question(question.id)
         print(f"[{datetime.now()}] Updated standalone question {question_id}")
         
         return jsonify({
@@ -702,7 +1273,8 @@ def update_standalone_question(question_id):
             "question_type": question.question_type,
             "options": question.options,
             "answer": question.answer,
-            "explanation": question.explanation
+            "explanation": question.explanation,
+            "category_id": question.category_id
         }), 200
         
     except Exception as e:
@@ -728,8 +1300,15 @@ def delete_standalone_question(question_id):
         # Store question title for response
         question_text = question.question
         
+        # Drop its answers in one statement (also covers databases without ON DELETE CASCADE)
+        UserAnswer.query.filter(UserAnswer.standalone_question_id == question_id).delete(synchronize_session=False)
         db.session.delete(question)
+        reset_question_stats(0, question_id)
         db.session.commit()
+        search_index.remove_question(question_id)
+        question_sampler.remove(question_id)
+        dynamic_quiz_buffer.clear()
+        answer_key_index.invalidate_question(question_id)
         
         print(f"[{datetime.now()}] Deleted standalone question {question_id}: {question_text}")
         return jsonify({
@@ -0,0 +1,67 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from backend.models import db, Quiz, StandaloneQuestion
+from backend.services.search_index import search_index
+from routes.quiz_routes import catalog_query, serialize_catalog_row
+from datetime import datetime
+import traceback
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search():
+    """Ranked full-text search over quizzes (and standalone questions for admins).
+
+    Query params: q (required), type (quiz|question|all, default quiz), limit (max 50).
+    """
+    try:
+        user_id = get_jwt_identity()
+        claims = get_jwt()
+        role = claims.get('role')
+        print(f"[{datetime.now()}] Authenticated user ID: {user_id}, Role: {role}")
+        if role not in ['admin', 'user']:
+            return jsonify({'message': 'Unauthorized access'}), 403
+
+        query_text = (request.args.get('q') or '').strip()
+        search_type = request.args.get('type', 'quiz')
+        limit = max(1, min(request.args.get('limit', type=int, default=20), 50))
+        if not query_text:
+            return jsonify({'message': 'Missing search query'}), 400
+        if search_type not in ['quiz', 'question', 'all']:
+            return jsonify({'message': 'Invalid search type'}), 400
+        kinds = ('quiz', 'question') if search_type == 'all' else (search_type,)
+        if 'question' in kinds and role != 'admin':
+            if search_type == 'question':
+                return jsonify({'message': 'Only admins can search standalone questions'}), 403
+            kinds = ('quiz',)
+
+        hits = search_index.search(query_text, kinds=kinds, limit=limit)
+        quiz_ids = [key[1] for key, _ in hits if key[0] == 'quiz']
+        question_ids = [key[1] for key, _ in hits if key[0] == 'question']
+
+        # Hydrate hits with one query per kind
+        quizzes = {row.id: row for row in catalog_query().filter(Quiz.id.in_(quiz_ids)).all()} if quiz_ids else {}
+        questions = {
+            row.id: row for row in db.session.query(
+                StandaloneQuestion.id, StandaloneQuestion.question, StandaloneQuestion.question_type
+            ).filter(StandaloneQuestion.id.in_(question_ids)).all()
+        } if question_ids else {}
+
+        results = []
+        for (kind, doc_id), score in hits:
+            if kind == 'quiz' and doc_id in quizzes:
+                results.append({'type': 'quiz', 'score': round(score, 4), 'quiz': serialize_catalog_row(quizzes[doc_id])})
+            elif kind == 'question' and doc_id in questions:
+                row = questions[doc_id]
+                results.append({
+                    'type': 'question',
+                    'score': round(score, 4),
+                    'question': {'id': row.id, 'question': row.question, 'question_type': row.question_type}
+                })
+        print(f"[{datetime.now()}] Search '{query_text}' ({search_type}) returned {len(results)} results")
+        return jsonify({'query': query_text, 'results': results}), 200
+    except Exception as e:
+        print(f"[{datetime.now()}] Error in search: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'message': 'Internal server error'}), 500
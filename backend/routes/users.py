@@ -1,89 +1,239 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models import db, User,QuizHistory
-import json
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
+from backend.models import db, User, UserSummary
+from backend.services.leaderboard import leaderboard_for, LEADERBOARD_WINDOWS
+from routes.quiz_routes import encode_cursor, decode_cursor
+from sqlalchemy import and_, func, or_
 from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
+from decimal import Decimal
 
 
 user_bp = Blueprint('users', __name__)
 
 # Helper function to check if user is admin
 def check_admin():
+    """(True, admin id) for admin tokens, else (False, error response)."""
     try:
-        identity_str = get_jwt_identity()
-        print(f"Raw identity from JWT: {identity_str}, type: {type(identity_str)}")  # Debug log
-        identity = json.loads(identity_str)  # Deserialize string to dict
-        print(f"Deserialized identity: {identity}, type: {type(identity)}")  # Debug log
-
-        if not isinstance(identity, dict):
-            print("Invalid JWT identity: Expected a dictionary after deserialization")  # Debug log
-            return False, jsonify({'message': 'Invalid token identity: Expected a dictionary'}), 422
-
-        role = identity.get('role')
+        identity = get_jwt_identity()
+        role = get_jwt().get('role')
+        print(f"Identity from JWT: {identity}, role: {role}")  # Debug log
         if role != 'admin':
             print("Not an admin, rejecting request")  # Debug log
-            return False, jsonify({'message': 'Admin access required'}), 403
-
-        return True, identity.get('id')
-    except json.JSONDecodeError as e:
-        print(f"JWT identity parse error: {e}")  # Debug log
-        return False, jsonify({'message': 'Invalid token: Failed to parse identity'}), 422
+            return False, (jsonify({'message': 'Admin access required'}), 403)
+        return True, int(identity)
     except Exception as e:
         print(f"Error in check_admin: {e}")  # Debug log
-        return False, jsonify({'message': 'Invalid token'}), 422
+        return False, (jsonify({'message': 'Invalid token'}), 422)
+
+# Users without a summary row yet (no finished quiz) are listed with zero attempts and score
+USER_ATTEMPTS = func.coalesce(UserSummary.attempts, 0)
+USER_AVG_SCORE = func.coalesce(UserSummary.avg_score, 0)
+
+# Sort options for the admin user listing: (sort column, descending?)
+USER_SORTS = {
+    'activity': (UserSummary.last_completed_at, True),
+    'score': (USER_AVG_SCORE, True),
+    'quizzes': (USER_ATTEMPTS, True),
+    'name': (User.username, False),
+}
+USERS_DEFAULT_LIMIT = 50
+USERS_MAX_LIMIT = 200
+ACTIVE_DAYS = 30  # Users with an attempt in this many days are listed as active
+
+def user_listing_query():
+    """Users with their activity summary as plain columns; one indexed join, no per-user aggregates."""
+    return db.session.query(
+        User.id,
+        User.username,
+        User.email,
+        USER_ATTEMPTS.label('attempts'),
+        USER_AVG_SCORE.label('avg_score'),
+        UserSummary.last_completed_at
+    ).outerjoin(UserSummary, UserSummary.user_id == User.id).filter(User.role == 'user')
+
+def apply_user_keyset(query, sort, cursor, limit):
+    """Order users by (sort column, id) and seek past the cursor row, fetching one extra row.
+
+    Users who never finished a quiz have no last_completed_at and come last when sorting by activity.
+    Cursors carry the sort they were issued for; reusing one with another sort raises ValueError.
+    """
+    column, descending = USER_SORTS[sort]
+    if cursor:
+        cursor_sort, last_value, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError(f'Cursor was issued for sort {cursor_sort!r}, not {sort!r}')
+        if last_value is not None and sort == 'activity':
+            last_value = datetime.fromisoformat(last_value)
+        elif last_value is not None and sort == 'score':
+            last_value = Decimal(last_value)
+        if last_value is None:
+            query = query.filter(column.is_(None), User.id < last_id)
+        elif descending:
+            query = query.filter(or_(column < last_value, and_(column == last_value, User.id < last_id), column.is_(None)))
+        else:
+            query = query.filter(or_(column > last_value, and_(column == last_value, User.id > last_id)))
+    if descending:
+        # NULLs sort last in descending order on MySQL and SQLite
+        query = query.order_by(column.desc(), User.id.desc())
+    else:
+        query = query.order_by(column.asc(), User.id.asc())
+    return query.limit(limit + 1)
+
+def serialize_user_row(row, active_since):
+    return {
+        'id': row.id,
+        'name': row.username,
+        'email': row.email,
+        'quizzes': row.attempts,
+        'avgScore': float(row.avg_score),
+        'lastActive': row.last_completed_at.isoformat() if row.last_completed_at else '',
+        'status': 'active' if row.last_completed_at and row.last_completed_at >= active_since else 'inactive'
+    }
 
 @user_bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
-    """Fetch all users with role 'user'."""
+    """Users with role 'user' and their quiz activity, for the admin user table.
+
+    Query params: q (username or email prefix), sort (activity|score|quizzes|name), limit and
+    cursor. Passing limit or cursor returns a page envelope with nextCursor; otherwise the full
+    filtered list is returned as before.
+    """
     print("Received GET /api/users request")  # Debug log
     is_admin, response_or_admin_id = check_admin()
     if not is_admin:
         return response_or_admin_id
 
     try:
-        # Fetch users with role 'user'
-        users = User.query.filter_by(role='user').all()
-        print(f"Found {len(users)} users with role 'user'")  # Debug log
-        result = []
-        for user in users:
-            result.append({
-                'id': user.id,
-                'name': user.username,
-                'email': user.email,
-                'quizzes': 0,  # Placeholder, as requested
-                'avgScore': 0,  # Placeholder, as requested
-                'lastActive': '',  # Placeholder, as requested
-                'status': ''  # Placeholder, as requested
-            })
-        return jsonify(result), 200
+        search = (request.args.get('q') or '').strip()
+        sort = request.args.get('sort', 'activity')
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        if sort not in USER_SORTS:
+            return jsonify({'message': f"Invalid sort option, expected one of: {', '.join(USER_SORTS)}"}), 400
+
+        query = user_listing_query()
+        if search:
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(or_(User.username.like(f'{escaped}%', escape='\\'), User.email.like(f'{escaped.lower()}%', escape='\\')))
+        active_since = datetime.now() - timedelta(days=ACTIVE_DAYS)
+
+        if cursor is None and limit is None:
+            column, descending = USER_SORTS[sort]
+            rows = query.order_by(column.desc() if descending else column.asc(), User.id.desc() if descending else User.id.asc()).all()
+            print(f"Found {len(rows)} users with role 'user'")  # Debug log
+            return jsonify([serialize_user_row(row, active_since) for row in rows]), 200
+
+        limit = max(1, min(limit or USERS_DEFAULT_LIMIT, USERS_MAX_LIMIT))
+        try:
+            rows = apply_user_keyset(query, sort, cursor, limit).all()
+        except (ValueError, TypeError, ArithmeticError) as e:
+            print(f"Invalid users cursor: {str(e)}")  # Debug log
+            return jsonify({'message': 'Invalid cursor'}), 400
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            last_value = {
+                'activity': last.last_completed_at.isoformat() if last.last_completed_at else None,
+                'score': str(last.avg_score),
+                'quizzes': last.attempts,
+                'name': last.username,
+            }[sort]
+            next_cursor = encode_cursor([sort, last_value, last.id])
+        print(f"Returning {len(rows)} users, next cursor: {next_cursor}")  # Debug log
+        return jsonify({
+            'users': [serialize_user_row(row, active_since) for row in rows],
+            'nextCursor': next_cursor,
+            'limit': limit,
+            'sort': sort
+        }), 200
     except Exception as e:
         print(f"Error fetching users: {str(e)}")  # Debug log
         return jsonify({'message': f'Error fetching users: {str(e)}'}), 500
 
+LEADERBOARD_MAX_LIMIT = 100
+LEADERBOARD_DEFAULT_AROUND = 5
+LEADERBOARD_MAX_AROUND = 50
+
+def resolve_leaderboard():
+    """Pick the ranking named by the request's window / category_id / quiz_id.
+
+    Returns (board, description, None) or (None, None, error response).
+    """
+    window = request.args.get('window', 'all')
+    if window != 'all' and window not in LEADERBOARD_WINDOWS:
+        return None, None, (jsonify({'message': f"Invalid window, expected one of: all, {', '.join(LEADERBOARD_WINDOWS)}"}), 400)
+    category_id = request.args.get('category_id')
+    quiz_id = request.args.get('quiz_id')
+    if category_id and quiz_id:
+        return None, None, (jsonify({'message': 'Use either category_id or quiz_id, not both'}), 400)
+    if not (category_id or quiz_id):
+        return leaderboard_for(window), {'window': window}, None
+    if window != 'all':
+        return None, None, (jsonify({'message': 'Category and quiz leaderboards are all-time only'}), 400)
+    scope, scope_id = ('category', category_id) if category_id else ('quiz', quiz_id)
+    try:
+        scope_id = int(scope_id)
+    except ValueError:
+        return None, None, (jsonify({'message': f'Invalid {scope}_id format'}), 400)
+    return leaderboard_for(scope=scope, scope_id=scope_id), {'window': window, 'scope': scope, 'scopeId': scope_id}, None
+
 @user_bp.route('/leaderboard', methods=['GET'])
 def get_leaderboard():
+    """Users ranked by points, served from the in-memory leaderboards.
+
+    `window` is 'all' (default, every user by all-time points) or one of today/week/month/season
+    (users with attempts in that window). `category_id` ranks users by their all-time points in
+    that category and `quiz_id` by their best score on that quiz; both list only users who
+    played it. Without `limit`/`offset` the whole ranking is returned as a list; with them, a
+    page {leaderboard, total, offset, limit, window[, scope, scopeId]}. `around=me` (user token
+    required) returns the caller's entry and `k` neighbours above and below instead.
+    """
+    around = request.args.get('around')
+    if around:
+        if around != 'me':
+            return jsonify({'message': "Invalid around, expected 'me'"}), 400
+        verify_jwt_in_request()  # Missing/invalid tokens get flask_jwt_extended's 401/422
     try:
-        # Join users and quiz_history to calculate total score per user
-        leaderboard = db.session.query(
-            User.id,
-            User.username.label('name'),
-            db.func.coalesce(db.func.sum(QuizHistory.score), 0).label('total_score')
-        ).outerjoin(QuizHistory, User.id == QuizHistory.user_id
-        ).group_by(User.id, User.username
-        ).order_by(db.func.coalesce(db.func.sum(QuizHistory.score), 0).desc()
-        ).all()
-
-        result = []
-        for rank, (user_id, name, total_score) in enumerate(leaderboard, 1):
-            result.append({'id': user_id, 'name': name, 'points': int(total_score), 'rank': rank})
-
-        if not result:
-            users = User.query.all()
-            result = [{'id': u.id, 'name': u.username, 'points': 0, 'rank': rank} for rank, u in enumerate(users, 1)]
-
-        return jsonify(result), 200
+        board, description, error = resolve_leaderboard()
+        if error:
+            return error
+
+        if around:
+            if get_jwt().get('role') != 'user':
+                return jsonify({'message': 'Only users have a leaderboard rank'}), 403
+            k = max(0, min(request.args.get('k', LEADERBOARD_DEFAULT_AROUND, type=int), LEADERBOARD_MAX_AROUND))
+            me, entries = board.around(int(get_jwt_identity()), k)
+            return jsonify(dict(description, leaderboard=entries, me=me, total=len(board), k=k)), 200
+
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', type=int)
+        if limit is None and offset is None:
+            return jsonify(board.page()), 200
+
+        limit = max(1, min(limit or 20, LEADERBOARD_MAX_LIMIT))
+        offset = max(offset or 0, 0)
+        return jsonify(dict(description, leaderboard=board.page(offset, limit), total=len(board), offset=offset, limit=limit)), 200
     except SQLAlchemyError as e:
         return jsonify({'message': f'Database error: {str(e)}', 'data': []}), 500
     except Exception as e:
-        return jsonify({'message': f'Unexpected error: {str(e)}', 'data': []}), 500
\ No newline at end of file
+        return jsonify({'message': f'Unexpected error: {str(e)}', 'data': []}), 500
+
+@user_bp.route('/leaderboard/users/<int:user_id>', methods=['GET'])
+def get_leaderboard_rank(user_id):
+    """Rank, points and name of one user, all-time, in a `window`, or for a `category_id` / `quiz_id`."""
+    try:
+        board, _, error = resolve_leaderboard()
+        if error:
+            return error
+        entry = board.rank_of(user_id)
+        if entry is None:
+            return jsonify({'message': 'User not ranked'}), 404
+        return jsonify(entry), 200
+    except SQLAlchemyError as e:
+        return jsonify({'message': f'Database error: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'message': f'Unexpected error: {str(e)}'}), 500
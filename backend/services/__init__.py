@@ -0,0 +1,25 @@
+# In-process indexes and caches that sit in front of the database.
+# Each service is rebuilt from the database when the app starts and kept
+# up to date by the write paths in routes/.
+from backend.models import db
+from datetime import datetime
+
+from .search_index import search_index
+from .question_sampler import question_sampler
+from .leaderboard import leaderboard, windowed_leaderboard
+
+
+def warm_services(app):
+    """Build the in-process indexes at startup; failures are logged, never fatal."""
+    with app.app_context():
+        for name, warm in [
+            ('search index', search_index.rebuild),
+            ('question sampler', question_sampler.rebuild),
+            ('leaderboard', leaderboard.rebuild),
+            ('windowed leaderboard', windowed_leaderboard.rebuild),
+        ]:
+            try:
+                warm()
+            except Exception as e:
+                db.session.rollback()
+                print(f"[{datetime.now()}] Skipping {name} warm-up: {str(e)}")
@@ -0,0 +1,137 @@
+from backend.models import db, Question, StandaloneQuestion
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime
+import threading
+
+UNKNOWN = 0          # Standalone slot not loaded yet
+NO_OPTIONS = 255     # Question exists but has no usable options
+MAX_OPTIONS = 64     # Correct positions are kept in a 64-bit mask
+
+
+def encode_key(options, answer):
+    """(option_count, correct_mask) for one question; bit i of the mask is option id i + 1."""
+    if not options or not isinstance(options, (list, tuple)):
+        return NO_OPTIONS, 0
+    mask = 0
+    for idx, opt in enumerate(options[:MAX_OPTIONS]):
+        if opt == answer:
+            mask |= 1 << idx
+    return min(len(options), NO_OPTIONS - 1), mask
+
+
+class AnswerKeyIndex:
+    """Answer keys (option count + correct-position bitmask) for grading without reading question rows.
+
+    StandaloneQuestion keys live in two dense arrays indexed by question id and are loaded on
+    demand. Question keys are kept per quiz as id-sorted arrays in an LRU of `max_quizzes`
+    entries, so cold quizzes are evicted and memory stays bounded.
+    """
+
+    def __init__(self, max_quizzes=256):
+        self.max_quizzes = max_quizzes
+        self._standalone_counts = array('B')
+        self._standalone_masks = array('Q')
+        self._quizzes = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by invalidations so in-flight loads don't store stale keys
+
+    def _ensure_standalone_capacity(self, question_id):
+        missing = question_id + 1 - len(self._standalone_counts)
+        if missing > 0:
+            self._standalone_counts.extend(bytes(missing))
+            self._standalone_masks.extend([0] * missing)
+
+    def _standalone_keys(self, question_ids):
+        keys, missing = {}, []
+        with self._lock:
+            for question_id in question_ids:
+                if 0 < question_id < len(self._standalone_counts) and self._standalone_counts[question_id] != UNKNOWN:
+                    keys[question_id] = (self._standalone_counts[question_id], self._standalone_masks[question_id])
+                else:
+                    missing.append(question_id)
+            generation = self._generation
+        if missing:
+            rows = db.session.query(StandaloneQuestion.id, StandaloneQuestion.options, StandaloneQuestion.answer
+                                    ).filter(StandaloneQuestion.id.in_(missing)).all()
+            with self._lock:
+                store = generation == self._generation
+                for row in rows:
+                    count, mask = encode_key(row.options, row.answer)
+                    keys[row.id] = (count, mask)
+                    if store:
+                        self._ensure_standalone_capacity(row.id)
+                        self._standalone_counts[row.id] = count
+                        self._standalone_masks[row.id] = mask
+        return keys
+
+    def _quiz_entry(self, quiz_id):
+        with self._lock:
+            entry = self._quizzes.get(quiz_id)
+            if entry is not None:
+                self._quizzes.move_to_end(quiz_id)
+                return entry
+            generation = self._generation
+        ids, counts, masks = array('l'), array('B'), array('Q')
+        rows = db.session.query(Question.id, Question.options, Question.answer
+                                ).filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+        for row in rows:
+            count, mask = encode_key(row.options, row.answer)
+            ids.append(row.id)
+            counts.append(count)
+            masks.append(mask)
+        entry = (ids, counts, masks)
+        with self._lock:
+            if generation != self._generation:
+                return entry
+            self._quizzes[quiz_id] = entry
+            self._quizzes.move_to_end(quiz_id)
+            while len(self._quizzes) > self.max_quizzes:
+                self._quizzes.popitem(last=False)
+        return entry
+
+    def keys_for(self, question_ids, is_dynamic, quiz_id=None):
+        """Answer keys {question_id: (option_count, correct_mask)} for the given ids.
+
+        Static quizzes only resolve questions that belong to quiz_id. Unknown ids are omitted;
+        questions without options map to (NO_OPTIONS, 0).
+        """
+        if not question_ids:
+            return {}
+        if is_dynamic:
+            return self._standalone_keys(question_ids)
+        ids, counts, masks = self._quiz_entry(quiz_id)
+        keys = {}
+        for question_id in question_ids:
+            idx = bisect_left(ids, question_id)
+            if idx < len(ids) and ids[idx] == question_id:
+                keys[question_id] = (counts[idx], masks[idx])
+        return keys
+
+    def invalidate_question(self, question_id):
+        """Forget a standalone question's key after it was edited or deleted."""
+        with self._lock:
+            self._generation += 1
+            if 0 < question_id < len(self._standalone_counts):
+                self._standalone_counts[question_id] = UNKNOWN
+                self._standalone_masks[question_id] = 0
+        print(f"[{datetime.now()}] Invalidated answer key for standalone question {question_id}")
+
+    def invalidate_quiz(self, quiz_id):
+        """Forget a quiz's keys after the quiz or its questions changed."""
+        with self._lock:
+            self._generation += 1
+            self._quizzes.pop(quiz_id, None)
+        print(f"[{datetime.now()}] Invalidated answer keys for quiz {quiz_id}")
+
+    def clear(self):
+        """Forget every cached key, e.g. after the question tables were reloaded."""
+        with self._lock:
+            self._generation += 1
+            self._standalone_counts = array('B')
+            self._standalone_masks = array('Q')
+            self._quizzes.clear()
+
+
+answer_key_index = AnswerKeyIndex()
@@ -0,0 +1,43 @@
+from backend.models import db, QuizAttemptCounter, QuizHistory
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+
+def counter_key(user_id, quiz_id, category_id):
+    """Primary key of the counter row; dynamic quizzes and "all categories" map to 0."""
+    return int(user_id), int(quiz_id or 0), int(category_id or 0)
+
+
+def claim_attempt_numbers(user_id, quiz_id, category_id, count=1):
+    """Atomically reserve `count` consecutive attempt numbers and return the first one.
+
+    The counter row is bumped with a single UPDATE, which holds its row lock until the
+    caller's transaction commits, so concurrent submits for the same user/quiz/category
+    are serialized and always get distinct, gap-free numbers. Only the first attempt for a
+    key (with no counter row yet) looks at quiz_history, to continue existing numbering.
+    """
+    user_key, quiz_key, category_key = counter_key(user_id, quiz_id, category_id)
+    where = (
+        (QuizAttemptCounter.user_id == user_key)
+        & (QuizAttemptCounter.quiz_key == quiz_key)
+        & (QuizAttemptCounter.category_key == category_key)
+    )
+    bump = update(QuizAttemptCounter).where(where).values(last_attempt=QuizAttemptCounter.last_attempt + count)
+
+    if db.session.execute(bump).rowcount == 0:
+        existing = db.session.query(func.coalesce(func.max(QuizHistory.attempt_number), 0)).filter(
+            QuizHistory.user_id == user_key,
+            func.coalesce(QuizHistory.quiz_id, 0) == quiz_key,
+            func.coalesce(QuizHistory.category_id, 0) == category_key
+        ).scalar()
+        try:
+            with db.session.begin_nested():
+                db.session.add(QuizAttemptCounter(user_id=user_key, quiz_key=quiz_key,
+                                                  category_key=category_key, last_attempt=existing + count))
+            return existing + 1
+        except IntegrityError:
+            # Another request created the row first; take our numbers from it instead
+            db.session.execute(bump)
+
+    last_attempt = db.session.execute(select(QuizAttemptCounter.last_attempt).where(where)).scalar()
+    return last_attempt - count + 1
@@ -0,0 +1,69 @@
+from backend.models import db, Category, Quiz
+from datetime import datetime
+import threading
+import time
+
+
+class CategoryListCache:
+    """The serialized category list with quiz counts, loaded with one grouped query.
+
+    Category and quiz write paths call clear(); the TTL only bounds staleness when another
+    worker process made the change.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entry = None  # (expires_at, [category dicts], {category_id: quiz_count})
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        quiz_counts = db.session.query(Quiz.category_id, db.func.count(Quiz.id).label('quiz_count')) \
+            .group_by(Quiz.category_id).subquery()
+        rows = db.session.query(Category, db.func.coalesce(quiz_counts.c.quiz_count, 0)) \
+            .outerjoin(quiz_counts, quiz_counts.c.category_id == Category.id) \
+            .order_by(Category.id).all()
+        categories = [{
+            'id': category.id,
+            'name': category.name,
+            'description': category.description,
+            'icon': category.icon,
+            'isActive': category.is_active,
+            'quizCount': quiz_count
+        } for category, quiz_count in rows]
+        return categories, {category['id']: category['quizCount'] for category in categories}
+
+    def _get(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._entry and self._entry[0] > now:
+                self.hits += 1
+                return self._entry
+            self.misses += 1
+            generation = self._generation
+
+        categories, counts = self._load()
+        entry = (now + self.ttl_seconds, categories, counts)
+        with self._lock:
+            # Skip the store if an invalidation ran while we were loading
+            if generation == self._generation:
+                self._entry = entry
+        print(f"[{datetime.now()}] Loaded {len(categories)} categories with quiz counts")
+        return entry
+
+    def categories(self):
+        """Category dicts (id, name, description, icon, isActive, quizCount); do not mutate."""
+        return self._get()[1]
+
+    def quiz_count(self, category_id):
+        return self._get()[2].get(category_id, 0)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+
+category_list_cache = CategoryListCache()
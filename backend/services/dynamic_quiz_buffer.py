@@ -0,0 +1,148 @@
+from backend.models import db
+from collections import deque
+from datetime import datetime
+import threading
+
+
+class DynamicQuizBuffer:
+    """Ring buffers of pre-built, pre-serialized all-category dynamic quizzes.
+
+    A background producer keeps one bounded deque per (mode, num_questions) key topped up:
+    a key is refilled to `capacity` once it drops to `refill_threshold` entries, as long as
+    the total buffered bytes stay under `max_bytes`. Keys are registered on first request,
+    up to `max_keys`. Each entry is (question_ids, json_bytes) so pop() can skip payloads
+    that contain questions the caller has already seen.
+    """
+
+    def __init__(self, modes=('rapidfire', 'multiplayer'), capacity=32, refill_threshold=8,
+                 max_bytes=32 * 1024 * 1024, max_keys=8, idle_seconds=5):
+        self.modes = set(modes)
+        self.capacity = capacity
+        self.refill_threshold = refill_threshold
+        self.max_bytes = max_bytes
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._buffers = {}
+        self._bytes = 0
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.hits = 0
+        self.misses = 0
+
+    def handles(self, mode):
+        return self._thread is not None and mode in self.modes
+
+    def start(self, app, builder):
+        """Start the producer thread once; builder(mode, num_questions) returns a payload dict or None."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._app = app
+            self._builder = builder
+            self._thread = threading.Thread(target=self._run, name='dynamic-quiz-producer', daemon=True)
+            self._thread.start()
+        print(f"[{datetime.now()}] Dynamic quiz producer started for modes: {sorted(self.modes)}")
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def pop(self, mode, num_questions, exclude=None):
+        """Take a ready payload as (question_ids, json_bytes), or None on a miss.
+
+        Registers the key so the producer starts filling it.
+        """
+        key = (mode, num_questions)
+        with self._cond:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                if len(self._buffers) < self.max_keys:
+                    self._buffers[key] = deque(maxlen=self.capacity)
+                    self._cond.notify()
+                self.misses += 1
+                return None
+            for idx, entry in enumerate(buffer):
+                if not exclude or not any(question_id in exclude for question_id in entry[0]):
+                    del buffer[idx]
+                    self._bytes -= len(entry[1])
+                    self.hits += 1
+                    if len(buffer) <= self.refill_threshold:
+                        self._cond.notify()
+                    return entry
+            self.misses += 1
+            self._cond.notify()
+            return None
+
+    def clear(self):
+        """Drop every buffered payload, e.g. after the question bank changed."""
+        with self._cond:
+            for buffer in self._buffers.values():
+                buffer.clear()
+            self._bytes = 0
+            self._generation += 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes': self._bytes,
+                'buffers': {f'{mode}:{size}': len(buffer) for (mode, size), buffer in self._buffers.items()}
+            }
+
+    def _next_key_to_fill(self):
+        for key, buffer in self._buffers.items():
+            if len(buffer) <= self.refill_threshold:
+                return key
+        return None
+
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                with self._cond:
+                    key = self._next_key_to_fill()
+                    while not self._stopping and (key is None or self._bytes >= self.max_bytes):
+                        self._cond.wait(timeout=self.idle_seconds)
+                        key = self._next_key_to_fill()
+                    if self._stopping:
+                        return
+                try:
+                    self._fill(key)
+                except Exception as e:
+                    print(f"[{datetime.now()}] Dynamic quiz producer failed for {key}: {str(e)}")
+                    with self._cond:
+                        self._cond.wait(timeout=self.idle_seconds)
+                finally:
+                    db.session.remove()
+
+    def _fill(self, key):
+        mode, num_questions = key
+        built = 0
+        while True:
+            with self._cond:
+                buffer = self._buffers.get(key)
+                if buffer is None or self._stopping or len(buffer) >= self.capacity or self._bytes >= self.max_bytes:
+                    break
+                generation = self._generation
+            payload = self._builder(mode, num_questions)
+            if payload is None:
+                # Not enough questions for this size; back off until the next wake-up
+                with self._cond:
+                    self._cond.wait(timeout=self.idle_seconds)
+                break
+            entry = (tuple(int(q['id']) for q in payload['questions']), self._app.json.dumps(payload).encode())
+            with self._cond:
+                if generation != self._generation:
+                    continue  # Built from a bank that has since changed
+                buffer.append(entry)
+                self._bytes += len(entry[1])
+            built += 1
+        if built:
+            print(f"[{datetime.now()}] Dynamic quiz producer built {built} payloads for {mode}:{num_questions}")
+
+
+dynamic_quiz_buffer = DynamicQuizBuffer()
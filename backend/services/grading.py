@@ -0,0 +1,106 @@
+from backend.services.answer_keys import MAX_OPTIONS, NO_OPTIONS
+import numpy as np
+from datetime import datetime
+
+
+def parse_answers(answers):
+    """Normalize submitted answers to [(question_id, option_id)], skipping malformed entries.
+
+    A question answered more than once keeps its last answer, so single and bulk grading agree.
+    """
+    parsed = {}
+    for answer in answers:
+        question_id = answer.get('question_id')
+        if not question_id:
+            print(f"[{datetime.now()}] Skipping answer due to missing question_id")
+            continue
+        try:
+            question_id = int(question_id)
+        except (ValueError, TypeError) as e:
+            print(f"[{datetime.now()}] Invalid question_id format: {question_id}, error: {e}")
+            continue
+        if question_id <= 0:
+            print(f"[{datetime.now()}] Skipping answer with non-positive question_id: {question_id}")
+            continue
+        option_id = answer.get('option_id')
+        if not isinstance(option_id, int) or isinstance(option_id, bool):
+            option_id = None
+        parsed[question_id] = option_id
+    return list(parsed.items())
+
+
+def grade_answers(parsed_answers, answer_keys):
+    """Grade parsed answers against answer keys from answer_key_index.
+
+    Returns (correct_count, processed_questions, graded) where graded is a list of
+    (question_id, option_id, is_correct) for every answer to a known question; option_id is
+    None when the pick was missing or out of range.
+    """
+    correct_count = 0
+    graded = []
+    for question_id, option_id in parsed_answers:
+        key = answer_keys.get(question_id)
+        if key is None or key[0] == NO_OPTIONS:
+            print(f"[{datetime.now()}] Question not found or has no options: {question_id}")
+            continue
+        option_count, correct_mask = key
+        if option_id is None or not 1 <= option_id <= option_count:
+            print(f"[{datetime.now()}] Invalid or missing option_id {option_id} for question {question_id}, options length: {option_count}")
+            graded.append((question_id, None, False))  # Stored as unanswered
+            continue
+        is_correct = bool(correct_mask >> (option_id - 1) & 1)
+        correct_count += is_correct
+        graded.append((question_id, option_id, is_correct))
+    return correct_count, len(graded), graded
+
+
+def grade_attempt_matrix(parsed_attempts, answer_keys):
+    """Grade many attempts of the same quiz at once.
+
+    Builds an attempts x questions matrix of chosen option ids (0 = unanswered) over the union
+    of answered questions and scores it against the key vectors in one pass. If an attempt
+    answers the same question twice, the last answer wins. Option ids outside 1..option_count
+    are stored as 0 (answered, but wrong).
+    Returns (correct_counts, processed_counts, graded): two NumPy int arrays with one entry per
+    attempt, and per attempt a list of (question_id, option_id, is_correct) like grade_answers.
+    """
+    columns = sorted(question_id for question_id, key in answer_keys.items() if key[0] != NO_OPTIONS)
+    column_of = {question_id: idx for idx, question_id in enumerate(columns)}
+    option_counts = [answer_keys[q][0] for q in columns]
+    chosen = np.zeros((len(parsed_attempts), len(columns)), dtype=np.int64)
+    answered = np.zeros(chosen.shape, dtype=bool)
+    for row, parsed_answers in enumerate(parsed_attempts):
+        for question_id, option_id in parsed_answers:
+            col = column_of.get(question_id)
+            if col is None:
+                continue
+            answered[row, col] = True
+            valid_option = option_id is not None and 1 <= option_id <= option_counts[col]
+            chosen[row, col] = option_id if valid_option else 0
+    counts = np.array(option_counts, dtype=np.int64)
+    masks = np.array([answer_keys[q][1] for q in columns], dtype=np.uint64)
+    # Only the first MAX_OPTIONS positions can be correct; keep shifts inside the 64-bit mask
+    valid = (chosen >= 1) & (chosen <= np.minimum(counts, MAX_OPTIONS))
+    shifts = np.where(valid, chosen - 1, 0).astype(np.uint64)
+    correct = valid & ((masks >> shifts) & np.uint64(1)).astype(bool)
+    graded = [[] for _ in parsed_attempts]
+    rows, cols = np.nonzero(answered)
+    for row, col, option_id, is_correct in zip(rows.tolist(), cols.tolist(), chosen[rows, cols].tolist(), correct[rows, cols].tolist()):
+        graded[row].append((columns[col], option_id or None, is_correct))
+    return correct.sum(axis=1), answered.sum(axis=1), graded
+
+
+def user_answer_rows(user_id, quiz_id, graded, answered_at):
+    """UserAnswer column dicts for one graded attempt, ready for a single multi-row INSERT.
+
+    Option ids that cannot be an option position are stored as None (unanswered).
+    """
+    return [{
+        'user_id': int(user_id),
+        'quiz_id': quiz_id,
+        'question_id': question_id if quiz_id else None,
+        'standalone_question_id': None if quiz_id else question_id,
+        'option_id': option_id if option_id is not None and 1 <= option_id < NO_OPTIONS else None,
+        'is_correct': is_correct,
+        'answered_at': answered_at
+    } for question_id, option_id, is_correct in graded]
@@ -0,0 +1,259 @@
+from backend.models import db, QuizHistory, UserAnswer
+from backend.services.question_stats import record_question_stats
+from backend.services.user_stats import daily_scores_committed, record_attempt_stats, record_daily_scores, record_user_summary
+from backend.services.leaderboard import leaderboard, scoped_leaderboards, windowed_leaderboard
+from collections import deque
+from datetime import datetime
+import atexit
+import threading
+
+WRITE_MODES = ('sync', 'queued', 'committed')
+
+
+def attempt_key(user_id, quiz_id, category_id, attempt_number):
+    """Identity of an attempt: its number is unique per (user, quiz, category) via the attempt counter."""
+    return int(user_id), int(quiz_id or 0), int(category_id or 0), int(attempt_number)
+
+
+def history_ids(rows):
+    """{attempt_key: QuizHistory.id} of just-inserted rows, read back through ix_quiz_history_user_attempt."""
+    found = db.session.query(
+        QuizHistory.id, QuizHistory.user_id, QuizHistory.quiz_id, QuizHistory.category_id, QuizHistory.attempt_number
+    ).filter(
+        QuizHistory.user_id.in_({int(row['user_id']) for row in rows}),
+        QuizHistory.attempt_number.in_({int(row['attempt_number']) for row in rows})
+    ).all()
+    ids = {}
+    for history_id, *key in found:
+        key = attempt_key(*key)
+        ids[key] = max(history_id, ids.get(key, 0))  # Newest row wins over legacy duplicates
+    return ids
+
+
+def insert_attempts(rows, answers=()):
+    """Insert QuizHistory rows, their UserAnswer rows and the stats rollups in the current transaction.
+
+    `answers`, if given, holds one list of UserAnswer column dicts per row; each answer is
+    linked to its attempt's QuizHistory id.
+    """
+    db.session.execute(db.insert(QuizHistory), rows)
+    if any(answers):
+        ids = history_ids(rows)
+        answer_rows = [
+            dict(answer, history_id=ids.get(attempt_key(row['user_id'], row.get('quiz_id'), row.get('category_id'), row['attempt_number'])))
+            for row, attempt_answers in zip(rows, answers) for answer in attempt_answers
+        ]
+        db.session.execute(db.insert(UserAnswer), answer_rows)
+        record_question_stats(rows, answers)
+    record_attempt_stats(rows)
+    record_user_summary(rows)
+    record_daily_scores(rows)
+
+
+def attempts_committed(rows):
+    """Update in-process rankings once QuizHistory rows are durably committed."""
+    if not rows:
+        return
+    daily_scores_committed()
+    points = {}
+    for row in rows:
+        points[int(row['user_id'])] = points.get(int(row['user_id']), 0) + row['score']
+    leaderboard.add_points(points)
+    windowed_leaderboard.add_attempts(rows)
+    scoped_leaderboards.on_committed(rows)
+
+
+class HistoryWriteError(Exception):
+    """A write-behind batch containing this attempt could not be committed."""
+
+
+class HistoryWriter:
+    """Write-behind queue for QuizHistory rows (and their UserAnswer rows) with group commit.
+
+    Modes (HISTORY_WRITE_MODE):
+      sync      - insert and commit in the request, as before (default)
+      queued    - acknowledge as soon as the row is queued; a background thread inserts
+                  batches of up to `batch_size` rows in one transaction
+      committed - queue the row but wait until the batch holding it is committed, so many
+                  concurrent submits share a single commit
+    The queue is bounded by `max_queue`; when it is full, the row is written synchronously
+    instead of being dropped. Pending rows are flushed when the process exits.
+    """
+
+    WAIT_POLL = 1.0  # Seconds between writer liveness checks while a committed-mode request waits
+
+    def __init__(self, mode='sync', max_queue=10000, batch_size=500, flush_interval=0.05, commit_timeout=30):
+        self.mode = mode
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.commit_timeout = commit_timeout
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.batches = 0
+        self.written = 0
+        self.overflows = 0
+        self.failures = 0
+
+    @property
+    def enabled(self):
+        return self._thread is not None
+
+    def configure(self, mode=None, max_queue=None, batch_size=None, flush_interval=None):
+        """Apply settings without starting the thread; raises ValueError for an unknown mode."""
+        if mode is not None:
+            self.mode = mode
+        if self.mode not in WRITE_MODES:
+            raise ValueError(f"Unknown HISTORY_WRITE_MODE {self.mode!r}, expected one of {WRITE_MODES}")
+        self.max_queue = max_queue or self.max_queue
+        self.batch_size = batch_size or self.batch_size
+        self.flush_interval = flush_interval if flush_interval is not None else self.flush_interval
+
+    def start(self, app, mode=None, max_queue=None, batch_size=None, flush_interval=None):
+        self.configure(mode, max_queue, batch_size, flush_interval)
+        with self._cond:
+            if self.mode == 'sync' or self._thread is not None:
+                return
+            self._app = app
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        print(f"[{datetime.now()}] History writer started in {self.mode} mode (batch {self.batch_size}, queue {self.max_queue})")
+
+    def stop(self, timeout=30):
+        """Flush every queued row and stop the writer thread."""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        print(f"[{datetime.now()}] History writer stopped, {len(self._queue)} rows left unflushed")
+
+    def write(self, row, answers=()):
+        """Persist one QuizHistory row and its UserAnswer rows (column dicts) per the configured mode."""
+        waiter = None
+        with self._cond:
+            if self._thread is not None and not self._stopping and len(self._queue) < self.max_queue:
+                if self.mode == 'committed':
+                    waiter = {'done': threading.Event(), 'error': None}
+                self._queue.append((row, answers, waiter))
+                if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+                queued = True
+            else:
+                queued = False
+                if self._thread is not None:
+                    self.overflows += 1
+        if not queued:
+            insert_attempts([row], [answers])
+            db.session.commit()
+            attempts_committed([row])
+            return
+        # Commit the request's own work (e.g. its attempt-number claim) and release its locks
+        db.session.commit()
+        if waiter is not None:
+            self._wait(waiter, row, answers)
+
+    def _wait(self, waiter, row, answers):
+        """Block until the batch holding `entry` is committed; never wait on a dead writer."""
+        waited = 0.0
+        while not waiter['done'].wait(self.WAIT_POLL):
+            waited += self.WAIT_POLL
+            thread = self._thread
+            if thread is not None and thread.is_alive() and waited < self.commit_timeout:
+                continue
+            with self._cond:
+                still_queued = any(queued[2] is waiter for queued in self._queue)
+                if still_queued:
+                    self._queue = deque(queued for queued in self._queue if queued[2] is not waiter)
+            if waiter['done'].is_set():
+                break
+            if not still_queued:
+                # Taken by a batch that never reported back; its outcome is unknown
+                raise HistoryWriteError('History writer did not confirm the write')
+            print(f"[{datetime.now()}] History writer unavailable, writing row for user {row['user_id']} synchronously")
+            insert_attempts([row], [answers])
+            db.session.commit()
+            attempts_committed([row])
+            return
+        if waiter['error'] is not None:
+            raise HistoryWriteError(waiter['error'])
+
+    def stats(self):
+        with self._cond:
+            return {
+                'mode': self.mode,
+                'queued': len(self._queue),
+                'batches': self.batches,
+                'written': self.written,
+                'overflows': self.overflows,
+                'failures': self.failures
+            }
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._queue and not self._stopping:
+                self._cond.wait()
+            if len(self._queue) < self.batch_size and not self._stopping:
+                # Give concurrent submits a moment to join this commit
+                self._cond.wait(timeout=self.flush_interval)
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    if self._stopping:
+                        return
+                    continue
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    # Keep the writer alive; release anyone still waiting on this batch
+                    print(f"[{datetime.now()}] History writer batch error: {str(e)}")
+                    for _, _, waiter in batch:
+                        if waiter is not None and not waiter['done'].is_set():
+                            waiter['error'] = str(e)
+                            waiter['done'].set()
+                finally:
+                    try:
+                        db.session.remove()
+                    except Exception as e:
+                        print(f"[{datetime.now()}] History writer session cleanup failed: {str(e)}")
+
+    def _commit(self, batch):
+        failed = []
+        try:
+            insert_attempts([row for row, _, _ in batch], [answers for _, answers, _ in batch])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[{datetime.now()}] History batch of {len(batch)} failed, retrying row by row: {str(e)}")
+            for entry in batch:
+                try:
+                    insert_attempts([entry[0]], [entry[1]])
+                    db.session.commit()
+                except Exception as row_error:
+                    db.session.rollback()
+                    failed.append((entry, str(row_error)))
+                    print(f"[{datetime.now()}] Dropped history row for user {entry[0]['user_id']}: {str(row_error)}")
+        failed_entries = {id(entry): message for entry, message in failed}
+        attempts_committed([entry[0] for entry in batch if id(entry) not in failed_entries])
+        with self._cond:
+            self.batches += 1
+            self.written += len(batch) - len(failed)
+            self.failures += len(failed)
+        for entry in batch:
+            waiter = entry[2]
+            if waiter is not None:
+                waiter['error'] = failed_entries.get(id(entry))
+                waiter['done'].set()
+
+
+history_writer = HistoryWriter()
@@ -0,0 +1,427 @@
+from backend.models import db, QuizHistory, User, UserDailyScore, UserStats
+from backend.services.user_stats import DAILY_RETENTION_DAYS, attempt_day, oldest_kept_day, utc_today
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+
+
+class RankedLeaderboard:
+    """Users ranked by total points, kept in memory and updated as attempts are recorded.
+
+    Users are held in rank order as (-points, user_id) keys, so ties go to the lower id. The
+    keys live in sorted blocks of up to 2 * BLOCK entries with a Fenwick tree over the block
+    sizes, so a user's rank or the user at a given position is found in O(log N + BLOCK)
+    and memory grows with the number of users, not with the highest total.
+    """
+
+    BLOCK = 512
+
+    def __init__(self, name_of=None):
+        self._name_of = name_of  # Scoped boards borrow user names from the global board
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._points = {}
+        self._names = {}
+        self._build([])
+
+    def _build(self, keys):
+        """Split already sorted keys into blocks."""
+        self._blocks = [keys[i:i + self.BLOCK] for i in range(0, len(keys), self.BLOCK)]
+        self._reindex()
+
+    def _reindex(self):
+        """Recompute block maxima and the size tree after a block was split or emptied."""
+        self._maxes = [block[-1] for block in self._blocks]
+        count = len(self._blocks)
+        tree = array('q', bytes(8 * (count + 1)))
+        for i, block in enumerate(self._blocks, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent <= count:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    # Fenwick tree over block sizes (tree index = block index + 1)
+    def _tree_add(self, block_index, delta):
+        i = block_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, block_index):
+        i, total = block_index, 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position):
+        """(block index, offset in block) of the key at 0-based `position`."""
+        block_index, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = block_index + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                block_index = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return block_index, position
+
+    def _place(self, user_id, points):
+        self._points[user_id] = points
+        key = (-points, user_id)
+        if not self._blocks:
+            self._build([key])
+            return
+        i = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        block = self._blocks[i]
+        insort(block, key)
+        self._maxes[i] = block[-1]
+        self._tree_add(i, 1)
+        if len(block) > 2 * self.BLOCK:
+            self._blocks[i:i + 1] = [block[:self.BLOCK], block[self.BLOCK:]]
+            self._reindex()
+
+    def _unplace(self, user_id):
+        points = self._points.pop(user_id)
+        key = (-points, user_id)
+        i = bisect_left(self._maxes, key)
+        block = self._blocks[i]
+        del block[bisect_left(block, key)]
+        if block:
+            self._maxes[i] = block[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._blocks[i]
+            self._reindex()
+        return points
+
+    def rebuild(self):
+        """Load every user with their total points (one GROUP BY over quiz_history)."""
+        totals = dict(db.session.query(QuizHistory.user_id, db.func.coalesce(db.func.sum(QuizHistory.score), 0))
+                      .group_by(QuizHistory.user_id).all())
+        users = db.session.query(User.id, User.username).all()
+        self.load({user_id: totals.get(user_id, 0) for user_id, _ in users}, dict(users))
+        print(f"[{datetime.now()}] Leaderboard loaded {len(users)} users")
+
+    def load(self, points, names=None):
+        """Replace the contents with {user_id: points}."""
+        with self._lock:
+            self._points = {user_id: max(int(user_points), 0) for user_id, user_points in points.items()}
+            self._names = dict(names or {})
+            self._build(sorted((-user_points, user_id) for user_id, user_points in self._points.items()))
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    def add_user(self, user_id, name):
+        """Register a new user with 0 points."""
+        with self._lock:
+            if not self._loaded or user_id in self._points:
+                return
+            self._names[user_id] = name
+            self._place(user_id, 0)
+
+    def add_points(self, deltas, add_missing=False):
+        """Apply {user_id: points} from newly committed attempts.
+
+        Users not on the board are skipped (picked up by the next rebuild) unless add_missing.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for user_id, delta in deltas.items():
+                if user_id in self._points:
+                    points = self._unplace(user_id)
+                elif add_missing:
+                    points = 0
+                else:
+                    continue
+                self._place(user_id, max(points + delta, 0))
+
+    def raise_to(self, scores):
+        """Keep each user's best score: apply {user_id: score} where it beats the current one."""
+        with self._lock:
+            if not self._loaded:
+                return
+            for user_id, score in scores.items():
+                if user_id in self._points:
+                    if score <= self._points[user_id]:
+                        continue
+                    self._unplace(user_id)
+                self._place(user_id, max(int(score), 0))
+
+    def __len__(self):
+        return len(self._points)
+
+    def name_of(self, user_id):
+        return self._names.get(user_id)
+
+    def _entry(self, user_id, rank):
+        name = self._name_of(user_id) if self._name_of else self._names.get(user_id)
+        return {'id': user_id, 'name': name, 'points': self._points[user_id], 'rank': rank}
+
+    def _rank(self, user_id):
+        key = (-self._points[user_id], user_id)
+        i = bisect_left(self._maxes, key)
+        return self._count_before(i) + bisect_left(self._blocks[i], key) + 1
+
+    def rank_of(self, user_id):
+        """{id, name, points, rank} for one user, or None if unknown."""
+        self.ensure_loaded()
+        with self._lock:
+            if user_id not in self._points:
+                return None
+            return self._entry(user_id, self._rank(user_id))
+
+    def around(self, user_id, k):
+        """(user's entry, entries ranked up to k above and k below it), or (None, []) if unknown."""
+        self.ensure_loaded()
+        with self._lock:
+            if user_id not in self._points:
+                return None, []
+            rank = self._rank(user_id)
+            entries = self._page(max(rank - 1 - k, 0), rank + k)
+        return entries[min(rank - 1, k)], entries
+
+    def page(self, offset=0, limit=None):
+        """Entries ranked offset + 1 .. offset + limit (all remaining when limit is None)."""
+        self.ensure_loaded()
+        with self._lock:
+            return self._page(offset, None if limit is None else offset + limit)
+
+    def _page(self, offset, end):
+        total = len(self._points)
+        end = total if end is None else min(total, end)
+        entries = []
+        if offset >= end:
+            return entries
+        block_index, start = self._locate(offset)
+        position = offset
+        while position < end:
+            for _, user_id in self._blocks[block_index][start:start + end - position]:
+                position += 1
+                entries.append(self._entry(user_id, position))
+            block_index, start = block_index + 1, 0
+        return entries
+
+
+# Window name -> number of days (today included); the season is the whole retention period
+LEADERBOARD_WINDOWS = {'today': 1, 'week': 7, 'month': 30, 'season': DAILY_RETENTION_DAYS}
+
+
+class WindowedLeaderboard:
+    """Daily/weekly/monthly/season rankings merged from per-user day buckets.
+
+    Mirrors the retained user_daily_score rows in memory (day -> {user_id: points}). Each
+    window is a RankedLeaderboard of per-user totals that committed attempts update in place;
+    the boards are re-merged from the buckets only when the day rolls over, which is also when
+    buckets older than the retention period are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._buckets = {}
+        self._day = None
+        self._boards = {}  # window -> RankedLeaderboard of the window's totals
+
+    def rebuild(self):
+        rows = db.session.query(UserDailyScore.day, UserDailyScore.user_id, UserDailyScore.points
+                                ).filter(UserDailyScore.day >= oldest_kept_day()).all()
+        buckets = {}
+        for day, user_id, points in rows:
+            buckets.setdefault(day, {})[user_id] = points
+        with self._lock:
+            self._buckets = buckets
+            self._day = None
+            self._loaded = True
+            self._refresh_day()
+        print(f"[{datetime.now()}] Windowed leaderboard loaded {len(rows)} day buckets")
+
+    def ensure_loaded(self):
+        leaderboard.ensure_loaded()  # Source of user names
+        if not self._loaded:
+            self.rebuild()
+
+    def _window_start(self, window):
+        return self._day - timedelta(days=LEADERBOARD_WINDOWS[window] - 1)
+
+    def _refresh_day(self):
+        today = utc_today()
+        if self._day == today:
+            return
+        self._day = today
+        oldest = oldest_kept_day(today)
+        for day in [day for day in self._buckets if day < oldest]:
+            del self._buckets[day]
+        boards = {}
+        for window in LEADERBOARD_WINDOWS:
+            start = self._window_start(window)
+            totals = {}
+            for day, bucket in self._buckets.items():
+                if day >= start:
+                    for user_id, points in bucket.items():
+                        totals[user_id] = totals.get(user_id, 0) + points
+            boards[window] = RankedLeaderboard(name_of=leaderboard.name_of)
+            boards[window].load(totals)
+        self._boards = boards
+
+    def add_attempts(self, rows):
+        """Apply committed QuizHistory column dicts to the buckets and window boards."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._refresh_day()
+            oldest = oldest_kept_day(self._day)
+            deltas = {window: {} for window in self._boards}
+            for row in rows:
+                day = attempt_day(row)
+                if day < oldest or day > self._day:
+                    continue
+                user_id, points = int(row['user_id']), row['score']
+                bucket = self._buckets.setdefault(day, {})
+                bucket[user_id] = bucket.get(user_id, 0) + points
+                for window, window_deltas in deltas.items():
+                    if day >= self._window_start(window):
+                        window_deltas[user_id] = window_deltas.get(user_id, 0) + points
+            for window, window_deltas in deltas.items():
+                if window_deltas:
+                    self._boards[window].add_points(window_deltas, add_missing=True)
+
+    def _board(self, window):
+        self.ensure_loaded()
+        with self._lock:
+            self._refresh_day()
+            return self._boards[window]
+
+    def total(self, window):
+        return len(self._board(window))
+
+    def page(self, window, offset=0, limit=None):
+        """Users with points in the window, ranked; users without attempts in it are omitted."""
+        return self._board(window).page(offset, limit)
+
+    def rank_of(self, window, user_id):
+        return self._board(window).rank_of(user_id)
+
+    def around(self, window, user_id, k):
+        """(user's entry, entries ranked up to k above and k below it), or (None, []) if unranked."""
+        return self._board(window).around(user_id, k)
+
+
+class WindowRanking:
+    """One window of the windowed leaderboard behind the RankedLeaderboard read interface."""
+
+    def __init__(self, board, window):
+        self._board = board
+        self.window = window
+
+    def __len__(self):
+        return self._board.total(self.window)
+
+    def page(self, offset=0, limit=None):
+        return self._board.page(self.window, offset, limit)
+
+    def rank_of(self, user_id):
+        return self._board.rank_of(self.window, user_id)
+
+    def around(self, user_id, k):
+        return self._board.around(self.window, user_id, k)
+
+
+LEADERBOARD_SCOPES = ('category', 'quiz')
+
+
+class ScopedLeaderboards:
+    """Per-category and per-quiz rankings, loaded on first use and kept up to date.
+
+    A category board ranks users by their total points in that category, read from the
+    user_stats rollup. A quiz board ranks users by their best score on the quiz, loaded with
+    one GROUP BY served from the (quiz_id, user_id, score) index rather than the table rows.
+    Each scope is a RankedLeaderboard; the most recently used `max_scopes` stay in memory and
+    committed attempts update the ones that are loaded.
+    """
+
+    def __init__(self, max_scopes=256):
+        self.max_scopes = max_scopes
+        self._lock = threading.Lock()
+        self._boards = OrderedDict()  # (scope, id) -> RankedLeaderboard
+        self._building = {}  # (scope, id) -> True once touched by a commit during its load
+
+    def _load(self, scope, scope_id):
+        if scope == 'category':
+            return dict(db.session.query(UserStats.user_id, UserStats.score_sum)
+                        .filter(UserStats.category_key == scope_id).all())
+        return dict(db.session.query(QuizHistory.user_id, db.func.max(QuizHistory.score))
+                    .filter(QuizHistory.quiz_id == scope_id).group_by(QuizHistory.user_id).all())
+
+    def board(self, scope, scope_id):
+        """RankedLeaderboard for one category or quiz, loading it if needed."""
+        key = (scope, int(scope_id))
+        with self._lock:
+            board = self._boards.get(key)
+            if board is not None:
+                self._boards.move_to_end(key)
+                return board
+            self._building[key] = False
+        leaderboard.ensure_loaded()  # Source of user names
+        points = self._load(*key)
+        board = RankedLeaderboard(name_of=leaderboard.name_of)
+        board.load(points)
+        with self._lock:
+            if self._building.pop(key, False):
+                # An attempt for this scope was committed while loading; serve it, cache a fresh load later
+                return board
+            self._boards[key] = board
+            while len(self._boards) > self.max_scopes:
+                self._boards.popitem(last=False)
+        return board
+
+    def on_committed(self, rows):
+        """Apply committed QuizHistory column dicts to the loaded category and quiz boards."""
+        category_points, quiz_best = {}, {}
+        for row in rows:
+            user_id = int(row['user_id'])
+            if row.get('category_id'):
+                points = category_points.setdefault(int(row['category_id']), {})
+                points[user_id] = points.get(user_id, 0) + row['score']
+            if row.get('quiz_id'):
+                best = quiz_best.setdefault(int(row['quiz_id']), {})
+                best[user_id] = max(best.get(user_id, 0), row['score'])
+        updates = [(('category', scope_id), points) for scope_id, points in category_points.items()]
+        updates += [(('quiz', scope_id), best) for scope_id, best in quiz_best.items()]
+        with self._lock:
+            targets = []
+            for key, values in updates:
+                if key in self._building:
+                    self._building[key] = True
+                board = self._boards.get(key)
+                if board is not None:
+                    targets.append((key[0], board, values))
+        for scope, board, values in targets:
+            if scope == 'category':
+                board.add_points(values, add_missing=True)
+            else:
+                board.raise_to(values)
+
+    def clear(self):
+        with self._lock:
+            self._boards.clear()
+
+
+leaderboard = RankedLeaderboard()
+windowed_leaderboard = WindowedLeaderboard()
+scoped_leaderboards = ScopedLeaderboards()
+
+
+def leaderboard_for(window='all', scope=None, scope_id=None):
+    """The ranking to read for a window ('all' or a LEADERBOARD_WINDOWS key) or a category/quiz scope."""
+    if scope is not None:
+        return scoped_leaderboards.board(scope, scope_id)
+    if window == 'all':
+        return leaderboard
+    return WindowRanking(windowed_leaderboard, window)
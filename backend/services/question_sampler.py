@@ -0,0 +1,207 @@
+from backend.models import db, StandaloneQuestion
+from array import array
+from datetime import datetime
+import random
+import threading
+import weakref
+
+ALL_CATEGORIES = None  # Pool key for the whole bank
+
+
+class QuestionSampler:
+    """Compact pools of eligible StandaloneQuestion ids for dynamic quizzes.
+
+    One array('l') holds every id and one more per category holds that category's ids.
+    Sampling draws k ids from the matching array and loads just those rows with a single
+    IN query, so cost depends on k rather than on the size of the bank.
+
+    Once most of a pool is excluded (seen), draws come from a per-(exclude set, pool) index
+    of the remaining ids instead, built once and then shrunk lazily as ids get excluded.
+    Any pool change bumps `_generation`, which retires those indexes.
+    """
+
+    MAX_DRAWS = 3
+    REJECTION_FACTOR = 20
+
+    def __init__(self):
+        self._pools = {ALL_CATEGORIES: array('l')}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._generation = 0
+        # exclude set -> {category_id: (generation, exclude version, array of not-yet-excluded ids)}
+        self._unseen = weakref.WeakKeyDictionary()
+
+    def rebuild(self):
+        """Reload the id pools from the database."""
+        pools = {ALL_CATEGORIES: array('l')}
+        rows = db.session.query(StandaloneQuestion.id, StandaloneQuestion.category_id).yield_per(5000)
+        for row in rows:
+            pools[ALL_CATEGORIES].append(row.id)
+            if row.category_id is not None:
+                pools.setdefault(row.category_id, array('l')).append(row.id)
+        with self._lock:
+            self._pools = pools
+            self._loaded = True
+            self._generation += 1
+        print(f"[{datetime.now()}] Question sampler loaded {len(pools[ALL_CATEGORIES])} standalone question ids in {len(pools) - 1} categories")
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    def add(self, question_id, category_id=None):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._generation += 1
+            self._pools[ALL_CATEGORIES].append(question_id)
+            if category_id is not None:
+                self._pools.setdefault(category_id, array('l')).append(question_id)
+
+    @staticmethod
+    def _swap_remove(ids, question_id):
+        try:
+            idx = ids.index(question_id)
+        except ValueError:
+            return
+        # Swap-remove keeps the array dense; order is irrelevant for sampling
+        ids[idx] = ids[-1]
+        ids.pop()
+
+    def remove(self, question_id, category_id=ALL_CATEGORIES):
+        """Drop a question from one category pool, or from every pool when no category is given."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._generation += 1
+            if category_id is not ALL_CATEGORIES:
+                targets = [self._pools.get(category_id)]
+            else:
+                targets = list(self._pools.values())
+            for ids in targets:
+                if ids is not None:
+                    self._swap_remove(ids, question_id)
+
+    def move(self, question_id, old_category_id, new_category_id):
+        """Re-file a question whose category changed."""
+        if old_category_id == new_category_id or not self._loaded:
+            return
+        with self._lock:
+            self._generation += 1
+            if old_category_id is not None and old_category_id in self._pools:
+                self._swap_remove(self._pools[old_category_id], question_id)
+            if new_category_id is not None:
+                self._pools.setdefault(new_category_id, array('l')).append(question_id)
+
+    def drop_category(self, category_id):
+        """Forget a deleted category's pool; its questions stay in the whole-bank pool."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._generation += 1
+            self._pools.pop(category_id, None)
+
+    def size(self, category_id=ALL_CATEGORIES):
+        self.ensure_loaded()
+        ids = self._pools.get(category_id)
+        return len(ids) if ids is not None else 0
+
+    def pool_ids(self, category_id=ALL_CATEGORIES):
+        """A copy of one pool's ids."""
+        self.ensure_loaded()
+        with self._lock:
+            return array('l', self._pools.get(category_id) or ())
+
+    def sample_ids(self, k, category_id=ALL_CATEGORIES, exclude=None):
+        """Draw up to k distinct ids uniformly at random from one pool, skipping ids in exclude.
+
+        While most of the pool is unexcluded, rejection sampling finds k ids within a budget of
+        REJECTION_FACTOR * k draws. When the budget runs out (or the pool is small), ids are
+        drawn from the index of unexcluded ids, so a request costs O(k) plus ids that became
+        excluded since the last draw; the index itself is built once per pool change or
+        exclusion reset. Fewer than k ids come back only when fewer than k remain.
+        """
+        self.ensure_loaded()
+        with self._lock:
+            ids = self._pools.get(category_id)
+            if not ids:
+                return []
+            if not exclude:
+                return random.sample(ids, min(k, len(ids)))
+            unseen = self._unseen_index(exclude, category_id, build=False)
+            if unseen is None and len(ids) > k * self.REJECTION_FACTOR:
+                picked = set()
+                size = len(ids)
+                for _ in range(k * self.REJECTION_FACTOR):
+                    question_id = ids[random.randrange(size)]
+                    if question_id not in exclude:
+                        picked.add(question_id)
+                        if len(picked) == k:
+                            return list(picked)
+            if unseen is None:
+                unseen = self._unseen_index(exclude, category_id, build=True)
+            return self._draw_unseen(unseen, k, exclude)
+
+    def _unseen_index(self, exclude, category_id, build):
+        """The cached array of pool ids not in exclude (a superset: newly excluded ids linger)."""
+        version = getattr(exclude, 'version', None)
+        try:
+            entry = self._unseen.get(exclude, {}).get(category_id)
+        except TypeError:
+            entry = None  # Not weak-referenceable or hashable; never cached
+        if entry is not None and entry[0] == self._generation and entry[1] == version:
+            return entry[2]
+        if not build:
+            return None
+        unseen = array('l', (i for i in self._pools[category_id] if i not in exclude))
+        if version is not None:
+            try:
+                self._unseen.setdefault(exclude, {})[category_id] = (self._generation, version, unseen)
+            except TypeError:
+                pass
+        return unseen
+
+    @staticmethod
+    def _draw_unseen(unseen, k, exclude):
+        """Partial Fisher-Yates over `unseen`, swap-removing ids that have been excluded since."""
+        picked = []
+        while len(picked) < k and len(picked) < len(unseen):
+            j = len(picked)
+            i = random.randrange(j, len(unseen))
+            unseen[j], unseen[i] = unseen[i], unseen[j]
+            if unseen[j] in exclude:
+                unseen[j] = unseen[-1]
+                unseen.pop()
+                continue
+            picked.append(unseen[j])
+        return picked
+
+    def sample_questions(self, k, category_id=ALL_CATEGORIES, exclude=None):
+        """Load k random StandaloneQuestion rows (optionally from one category) with one IN query.
+
+        exclude is any container of ids to skip, e.g. a user's SeenBitset.
+
+        Ids that disappeared or changed category (e.g. via another worker) are dropped from the
+        pool and topped up with a few follow-up draws.
+        """
+        questions = []
+        ids = self.sample_ids(k, category_id, exclude)
+        for _ in range(self.MAX_DRAWS):
+            if not ids:
+                break
+            query = StandaloneQuestion.query.filter(StandaloneQuestion.id.in_(ids))
+            if category_id is not ALL_CATEGORIES:
+                query = query.filter(StandaloneQuestion.category_id == category_id)
+            rows = query.all()
+            questions += rows
+            if len(questions) >= k:
+                break
+            found = {q.id for q in rows}
+            for missing in set(ids) - found:
+                self.remove(missing, category_id)
+            seen = {q.id for q in questions}
+            ids = [i for i in self.sample_ids(k, category_id, exclude) if i not in seen][:k - len(questions)]
+        return questions
+
+
+question_sampler = QuestionSampler()
@@ -0,0 +1,171 @@
+from backend.models import db, QuestionStats, QuizHistory, UserAnswer
+from backend.services.answer_keys import NO_OPTIONS
+from sqlalchemy import bindparam, case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+import math
+
+COUNTERS = ('picks', 'correct', 'score_sum', 'score_sq_sum', 'correct_score_sum')
+FLAG_MIN_ATTEMPTS = 20  # Fewer answers than this are too noisy to flag
+TOO_EASY_RATE = 0.9
+TOO_HARD_RATE = 0.2
+AMBIGUOUS_DISCRIMINATION = 0.1
+
+_table = QuestionStats.__table__
+_bump = update(_table).where(
+    _table.c.quiz_key == bindparam('k_quiz'),
+    _table.c.question_id == bindparam('k_question'),
+    _table.c.option_key == bindparam('k_option')
+).values(**{name: _table.c[name] + bindparam(f'd_{name}') for name in COUNTERS})
+
+
+def stats_key(answer):
+    """(quiz_key, question_id, option_key) of a UserAnswer column dict; bogus picks count as unanswered."""
+    quiz_key = int(answer.get('quiz_id') or 0)
+    question_id = answer['question_id'] if quiz_key else answer['standalone_question_id']
+    option_key = int(answer.get('option_id') or 0)
+    return quiz_key, int(question_id), option_key if 0 < option_key < NO_OPTIONS else 0
+
+
+def record_question_stats(rows, answers):
+    """Add graded answers to the per-question counters in the caller's transaction.
+
+    `answers[i]` holds the UserAnswer column dicts of `rows[i]`, whose score is what the
+    discrimination index correlates correctness with. Missing counter rows are inserted
+    first, then every counter is bumped by one executemany UPDATE, so a submission costs a
+    fixed number of statements however many questions it answers.
+    """
+    deltas = {}
+    for row, attempt_answers in zip(rows, answers):
+        score = row['score']
+        for answer in attempt_answers:
+            delta = deltas.setdefault(stats_key(answer), dict.fromkeys(COUNTERS, 0))
+            delta['picks'] += 1
+            delta['score_sum'] += score
+            delta['score_sq_sum'] += score * score
+            if answer['is_correct']:
+                delta['correct'] += 1
+                delta['correct_score_sum'] += score
+    if not deltas:
+        return
+
+    quiz_keys = {key[0] for key in deltas}
+    question_ids = {key[1] for key in deltas}
+    existing = {tuple(row) for row in db.session.execute(
+        select(QuestionStats.quiz_key, QuestionStats.question_id, QuestionStats.option_key)
+        .where(QuestionStats.quiz_key.in_(quiz_keys), QuestionStats.question_id.in_(question_ids))
+    )}
+    # Write counter rows in key order so concurrent submits lock them in the same order
+    missing = sorted(key for key in deltas if key not in existing)
+    if missing:
+        blank = dict.fromkeys(COUNTERS, 0)
+        new_rows = [dict(blank, quiz_key=key[0], question_id=key[1], option_key=key[2]) for key in missing]
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(_table), new_rows)
+        except IntegrityError:
+            # Some were created concurrently; insert the rest one by one
+            for new_row in new_rows:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(_table), [new_row])
+                except IntegrityError:
+                    pass
+
+    db.session.execute(_bump, [
+        dict({f'd_{name}': value for name, value in delta.items()}, k_quiz=key[0], k_question=key[1], k_option=key[2])
+        for key, delta in sorted(deltas.items())
+    ])
+
+
+def summarize_question(stats_rows, option_count):
+    """Fold one question's option rows into its analytics payload.
+
+    discrimination is the point-biserial correlation between answering correctly and the
+    attempt's score (None until both correct and incorrect answers with varying scores exist).
+    """
+    totals = dict.fromkeys(COUNTERS, 0)
+    picks = {}
+    for stats in stats_rows:
+        for name in COUNTERS:
+            totals[name] += getattr(stats, name)
+        picks[stats.option_key] = picks.get(stats.option_key, 0) + stats.picks
+
+    attempts, correct = totals['picks'], totals['correct']
+    correct_rate = correct / attempts if attempts else None
+    discrimination = None
+    if 0 < correct < attempts:
+        mean = totals['score_sum'] / attempts
+        variance = totals['score_sq_sum'] / attempts - mean * mean
+        if variance > 1e-9:
+            mean_correct = totals['correct_score_sum'] / correct
+            mean_incorrect = (totals['score_sum'] - totals['correct_score_sum']) / (attempts - correct)
+            discrimination = (mean_correct - mean_incorrect) / math.sqrt(variance) * math.sqrt(correct_rate * (1 - correct_rate))
+
+    flag = None
+    if attempts >= FLAG_MIN_ATTEMPTS:
+        if correct_rate >= TOO_EASY_RATE:
+            flag = 'too_easy'
+        elif correct_rate <= TOO_HARD_RATE:
+            flag = 'too_hard'
+        elif discrimination is not None and discrimination < AMBIGUOUS_DISCRIMINATION:
+            flag = 'ambiguous'
+
+    return {
+        'attempts': attempts,
+        'correctRate': round(correct_rate, 4) if correct_rate is not None else None,
+        'discrimination': round(discrimination, 4) if discrimination is not None else None,
+        'optionPicks': [picks.get(position, 0) for position in range(1, option_count + 1)],
+        'unanswered': sum(count for option_key, count in picks.items() if not 1 <= option_key <= option_count),
+        'flag': flag
+    }
+
+
+def read_question_stats(quiz_key, question_ids=None):
+    """{question_id: [QuestionStats rows]} for a quiz (or 0 for standalone questions)."""
+    query = QuestionStats.query.filter(QuestionStats.quiz_key == quiz_key)
+    if question_ids is not None:
+        query = query.filter(QuestionStats.question_id.in_(question_ids))
+    grouped = {}
+    for stats in query.all():
+        grouped.setdefault(stats.question_id, []).append(stats)
+    return grouped
+
+
+def reset_question_stats(quiz_key, question_id):
+    """Drop a question's counters, e.g. when its options or answer change."""
+    db.session.query(QuestionStats).filter(
+        QuestionStats.quiz_key == quiz_key, QuestionStats.question_id == question_id
+    ).delete(synchronize_session=False)
+
+
+def rebuild_question_stats():
+    """Recompute the counters from user_answer, pairing answers with their attempt's score.
+
+    Answers are matched to their attempt through user_answer.history_id; answers without an
+    attempt or a question are skipped. Returns the number of counter rows.
+    """
+    quiz_key = func.coalesce(UserAnswer.quiz_id, 0)
+    question_id = func.coalesce(UserAnswer.question_id, UserAnswer.standalone_question_id)
+    option_key = case((UserAnswer.option_id.between(1, NO_OPTIONS - 1), UserAnswer.option_id), else_=0)
+    correct = case((UserAnswer.is_correct.is_(True), 1), else_=0)
+    db.session.query(QuestionStats).delete()
+    db.session.execute(insert(QuestionStats).from_select(
+        ['quiz_key', 'question_id', 'option_key', *COUNTERS],
+        select(
+            quiz_key,
+            question_id,
+            option_key,
+            func.count(),
+            func.sum(correct),
+            func.sum(QuizHistory.score),
+            func.sum(QuizHistory.score * QuizHistory.score),
+            func.sum(correct * QuizHistory.score)
+        ).join(QuizHistory, QuizHistory.id == UserAnswer.history_id
+        ).where(question_id.is_not(None)
+        ).group_by(quiz_key, question_id, option_key)
+    ))
+    db.session.commit()
+    count = db.session.query(func.count()).select_from(QuestionStats).scalar()
+    print(f"[{datetime.now()}] Rebuilt {count} question stats rows")
+    return count
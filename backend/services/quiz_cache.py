@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import time
+
+
+class QuizPayloadCache:
+    """LRU cache of prepared quiz payloads (quiz metadata plus validated question list).
+
+    Entries are dropped explicitly by the write paths through invalidate()/clear(); the TTL
+    only bounds staleness when another worker process made the change.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, quiz_id, loader):
+        """Return the cached payload for quiz_id, calling loader(quiz_id) on a miss.
+
+        The loader returns (payload, cacheable); payload may be None for unknown quizzes.
+        Callers must copy before mutating the payload.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(quiz_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        payload, cacheable = loader(quiz_id)
+        if payload is None or not cacheable:
+            return payload
+        with self._lock:
+            # Skip the store if an invalidation ran while we were loading
+            if generation == self._generation:
+                self._entries[quiz_id] = (now + self.ttl_seconds, payload)
+                self._entries.move_to_end(quiz_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload
+
+    def invalidate(self, quiz_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(quiz_id, None)
+        print(f"[{datetime.now()}] Invalidated prepared payload for quiz {quiz_id}")
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+        print(f"[{datetime.now()}] Cleared prepared quiz payload cache")
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+quiz_payload_cache = QuizPayloadCache()
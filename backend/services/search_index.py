@@ -0,0 +1,169 @@
+from backend.models import db, Quiz, StandaloneQuestion
+from datetime import datetime
+import bisect
+import math
+import re
+import threading
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'the', 'to', 'was', 'what', 'which', 'who', 'with'
+}
+
+# Field weights per document kind; title/question text outranks description/explanation.
+FIELD_WEIGHTS = {
+    'quiz': {'title': 3.0, 'description': 1.0},
+    'question': {'question': 2.0, 'explanation': 1.0},
+}
+PREFIX_MATCH_PENALTY = 0.5
+
+
+def tokenize(text):
+    """Lower-case word tokens with stopwords removed."""
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def query_terms(query):
+    """Search terms of a query: tokenize() plus a trailing stopword, which may be a word still being typed."""
+    tokens = TOKEN_RE.findall((query or '').lower())
+    terms = [t for t in tokens if t not in STOPWORDS]
+    if tokens and tokens[-1] in STOPWORDS:
+        terms.append(tokens[-1])
+    return terms
+
+
+class SearchIndex:
+    """Inverted index over quiz titles/descriptions and standalone question text/explanations.
+
+    Postings map token -> {(kind, id): weight}, where weight is the sum of field weights
+    of every occurrence. A sorted vocabulary supports prefix matching with bisect.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._doc_tokens = {}
+        self._vocab = []
+        self._loaded = False
+
+    def rebuild(self):
+        """Rebuild the whole index from the database."""
+        postings, doc_tokens = {}, {}
+        quizzes = db.session.query(Quiz.id, Quiz.title, Quiz.description).filter(Quiz.is_active.is_(True))
+        for row in quizzes.yield_per(1000):
+            self._index_into(postings, doc_tokens, ('quiz', row.id), {'title': row.title, 'description': row.description})
+        questions = db.session.query(StandaloneQuestion.id, StandaloneQuestion.question, StandaloneQuestion.explanation)
+        for row in questions.yield_per(1000):
+            self._index_into(postings, doc_tokens, ('question', row.id), {'question': row.question, 'explanation': row.explanation})
+        with self._lock:
+            self._postings = postings
+            self._doc_tokens = doc_tokens
+            self._vocab = sorted(postings)
+            self._loaded = True
+        print(f"[{datetime.now()}] Search index built: {len(doc_tokens)} documents, {len(postings)} terms")
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild()
+
+    @staticmethod
+    def _index_into(postings, doc_tokens, key, fields):
+        weights = {}
+        for field, text in fields.items():
+            field_weight = FIELD_WEIGHTS[key[0]][field]
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + field_weight
+        for token, weight in weights.items():
+            postings.setdefault(token, {})[key] = weight
+        doc_tokens[key] = set(weights)
+
+    def _remove_locked(self, key):
+        for token in self._doc_tokens.pop(key, ()):
+            docs = self._postings.get(token)
+            if docs is None:
+                continue
+            docs.pop(key, None)
+            if not docs:
+                del self._postings[token]
+                idx = bisect.bisect_left(self._vocab, token)
+                if idx < len(self._vocab) and self._vocab[idx] == token:
+                    self._vocab.pop(idx)
+
+    def _upsert(self, key, fields):
+        if not self._loaded:
+            return  # The next search rebuilds from the database anyway
+        with self._lock:
+            self._remove_locked(key)
+            new_tokens = [t for t in set(tokenize(' '.join(v or '' for v in fields.values()))) if t not in self._postings]
+            self._index_into(self._postings, self._doc_tokens, key, fields)
+            for token in new_tokens:
+                bisect.insort(self._vocab, token)
+
+    def upsert_quiz(self, quiz):
+        """Index (or re-index) a quiz; inactive quizzes are removed from the index."""
+        if not quiz.is_active:
+            self.remove_quiz(quiz.id)
+            return
+        self._upsert(('quiz', quiz.id), {'title': quiz.title, 'description': quiz.description})
+
+    def remove_quiz(self, quiz_id):
+        with self._lock:
+            self._remove_locked(('quiz', quiz_id))
+
+    def upsert_question(self, question):
+        self._upsert(('question', question.id), {'question': question.question, 'explanation': question.explanation})
+
+    def remove_question(self, question_id):
+        with self._lock:
+            self._remove_locked(('question', question_id))
+
+    def _prefix_terms(self, prefix):
+        start = bisect.bisect_left(self._vocab, prefix)
+        terms = []
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            terms.append(token)
+        return terms
+
+    def search(self, query, kinds=('quiz', 'question'), limit=20):
+        """Return [((kind, id), score)] for documents matching every query term, best first.
+
+        The last term also matches as a prefix so results update while the user types;
+        it is kept even when it is a stopword, so "the" still finds "theory".
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        self.ensure_loaded()
+        with self._lock:
+            total_docs = max(len(self._doc_tokens), 1)
+            scores = None
+            for position, term in enumerate(terms):
+                expansions = [(term, 1.0)] if term in self._postings else []
+                if position == len(terms) - 1:
+                    expansions += [(t, PREFIX_MATCH_PENALTY) for t in self._prefix_terms(term) if t != term]
+                term_scores = {}
+                for token, factor in expansions:
+                    docs = self._postings[token]
+                    idf = math.log(1 + total_docs / len(docs))
+                    for key, weight in docs.items():
+                        if key[0] not in kinds:
+                            continue
+                        score = weight * idf * factor
+                        if score > term_scores.get(key, 0.0):
+                            term_scores[key] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {key: scores[key] + s for key, s in term_scores.items() if key in scores}
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0][0], item[0][1]))
+        return ranked[:limit]
+
+
+search_index = SearchIndex()
@@ -0,0 +1,111 @@
+from backend.models import db, UserSeenQuestions
+from collections import OrderedDict
+from datetime import datetime
+import threading
+
+
+class SeenBitset:
+    """Bitset over StandaloneQuestion ids; supports `question_id in bitset`.
+
+    `version` changes whenever ids are un-seen, so indexes of unseen ids built from it know
+    when they may be missing ids.
+    """
+
+    def __init__(self, data=b''):
+        self._bits = bytearray(data)
+        self.count = sum(bin(b).count('1') for b in self._bits)
+        self.version = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, question_id):
+        byte = question_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (question_id & 7)))
+
+    def add(self, question_id):
+        byte = question_id >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        mask = 1 << (question_id & 7)
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self.count += 1
+
+    def discard(self, question_id):
+        byte = question_id >> 3
+        mask = 1 << (question_id & 7)
+        if byte < len(self._bits) and self._bits[byte] & mask:
+            self._bits[byte] &= ~mask
+            self.count -= 1
+            self.version += 1
+
+    def clear(self):
+        self._bits = bytearray()
+        self.count = 0
+        self.version += 1
+
+    def to_bytes(self):
+        return bytes(self._bits)
+
+
+class SeenQuestionTracker:
+    """Per-user "recently seen" standalone questions for no-repeat dynamic quizzes.
+
+    Bitsets for recently active users are kept in an LRU (max_users entries) and written
+    through to user_seen_questions so they survive restarts. When the pool a user plays from
+    has no unseen questions left, that pool's ids are forgotten, which starts a new cycle for
+    it without touching other categories and keeps the state bounded by the size of the bank.
+    """
+
+    def __init__(self, max_users=2000):
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the user's bitset, loading it from the database on a cache miss."""
+        with self._lock:
+            seen = self._users.get(user_id)
+            if seen is not None:
+                self._users.move_to_end(user_id)
+                return seen
+        row = db.session.get(UserSeenQuestions, user_id)
+        seen = SeenBitset(row.seen_bits if row else b'')
+        with self._lock:
+            seen = self._users.setdefault(user_id, seen)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return seen
+
+    def mark_seen(self, user_id, question_ids, reset=False, reset_ids=None):
+        """Record served questions and persist the bitset.
+
+        A new cycle starts first when reset is set: only the ids in reset_ids are forgotten,
+        or everything when reset_ids is None.
+        """
+        seen = self.get(user_id)
+        with self._lock:
+            if reset and reset_ids is None:
+                seen.clear()
+            elif reset:
+                for question_id in reset_ids:
+                    seen.discard(question_id)
+            for question_id in question_ids:
+                seen.add(question_id)
+            data = seen.to_bytes()
+        row = db.session.get(UserSeenQuestions, user_id)
+        if row:
+            row.seen_bits = data
+        else:
+            db.session.add(UserSeenQuestions(user_id=user_id, seen_bits=data))
+        db.session.commit()
+        print(f"[{datetime.now()}] User {user_id} has seen {seen.count} standalone questions{' (new cycle)' if reset else ''}")
+
+    def forget(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+seen_question_tracker = SeenQuestionTracker()
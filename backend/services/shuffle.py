@@ -0,0 +1,44 @@
+import numpy as np
+import secrets
+
+
+def new_attempt_seed():
+    """A fresh 53-bit seed for one quiz attempt (fits losslessly in a JavaScript number)."""
+    return secrets.randbits(53)
+
+
+def attempt_permutations(seed, option_counts):
+    """Derive the question order and every option order of an attempt from its seed.
+
+    All permutations come from a single argsort over one (n + 1) x width matrix of random
+    keys: row 0 orders the n questions, row i + 1 orders question i's options, and padding
+    cells are pinned to +inf so they sort last. The same seed and option counts always give
+    the same result, so the presented order can be rebuilt at submit time.
+    Returns (question_order, option_orders) as lists of source indexes.
+    """
+    n = len(option_counts)
+    if n == 0:
+        return [], []
+    counts = np.array([n] + list(option_counts))
+    width = int(counts.max())
+    keys = np.random.default_rng(seed).random((n + 1, width))
+    keys[np.arange(width)[None, :] >= counts[:, None]] = np.inf
+    order = np.argsort(keys, axis=1, kind='stable')
+    question_order = order[0, :n].tolist()
+    option_orders = [order[i + 1, :count].tolist() for i, count in enumerate(option_counts)]
+    return question_order, option_orders
+
+
+def shuffle_questions(questions, seed):
+    """Return shuffled copies of mapped questions (dicts with an 'options' list) for an attempt.
+
+    questions must be in canonical order (ascending id) for the seed to be reproducible.
+    The input list and its dicts are not modified, so cached payloads can be passed in.
+    """
+    question_order, option_orders = attempt_permutations(seed, [len(q['options']) for q in questions])
+    shuffled = []
+    for idx in question_order:
+        q = questions[idx]
+        options = q['options']
+        shuffled.append(dict(q, options=[options[o] for o in option_orders[idx]]))
+    return shuffled
@@ -0,0 +1,226 @@
+from backend.models import db, Category, QuizHistory, User, UserDailyScore, UserStats, UserSummary
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+
+DAILY_RETENTION_DAYS = 90  # Longest leaderboard window (season); older day buckets are deleted
+_expired_before = None  # Oldest day kept after the last committed expiry pass
+
+
+def utc_today():
+    """Day buckets and leaderboard windows follow UTC, like the stored completion times."""
+    return datetime.now(timezone.utc).date()
+
+
+def oldest_kept_day(today=None):
+    return (today or utc_today()) - timedelta(days=DAILY_RETENTION_DAYS - 1)
+
+
+def attempt_day(row):
+    """Day bucket of a QuizHistory column dict (its UTC completion date); naive times are UTC."""
+    moment = row.get('completed_at') or row.get('started_at') or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def stats_deltas(rows):
+    """Fold QuizHistory column dicts into per-(user_id, category_key) increments."""
+    deltas = {}
+    for row in rows:
+        key = (int(row['user_id']), int(row.get('category_id') or 0))
+        delta = deltas.setdefault(key, {'attempts': 0, 'score_sum': 0, 'best_score': 0, 'time_sum': 0, 'last_completed_at': None})
+        delta['attempts'] += 1
+        delta['score_sum'] += row['score']
+        delta['best_score'] = max(delta['best_score'], row['score'])
+        delta['time_sum'] += row.get('time_taken') or 0
+        completed_at = row.get('completed_at')
+        if completed_at and (delta['last_completed_at'] is None or completed_at > delta['last_completed_at']):
+            delta['last_completed_at'] = completed_at
+    return deltas
+
+
+def record_attempt_stats(rows):
+    """Apply newly stored attempts to the user_stats rollup in the caller's transaction.
+
+    One UPDATE per (user, category) touched; the first attempt for a key inserts its row.
+    """
+    for (user_id, category_key), delta in stats_deltas(rows).items():
+        values = {
+            'attempts': UserStats.attempts + delta['attempts'],
+            'score_sum': UserStats.score_sum + delta['score_sum'],
+            'best_score': case((UserStats.best_score < delta['best_score'], delta['best_score']), else_=UserStats.best_score),
+            'time_sum': UserStats.time_sum + delta['time_sum'],
+        }
+        if delta['last_completed_at'] is not None:
+            values['last_completed_at'] = case(
+                (or_(UserStats.last_completed_at.is_(None), UserStats.last_completed_at < delta['last_completed_at']), delta['last_completed_at']),
+                else_=UserStats.last_completed_at
+            )
+        bump = update(UserStats).where(UserStats.user_id == user_id, UserStats.category_key == category_key).values(**values)
+        if db.session.execute(bump).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(UserStats(user_id=user_id, category_key=category_key, **delta))
+        except IntegrityError:
+            # Created concurrently by another request; apply the increment to it instead
+            db.session.execute(bump)
+
+
+def record_user_summary(rows):
+    """Apply newly stored attempts to the per-user summary behind the admin user listing."""
+    totals = {}
+    for (user_id, _), delta in stats_deltas(rows).items():
+        total = totals.setdefault(user_id, {'attempts': 0, 'score_sum': 0, 'last_completed_at': None})
+        total['attempts'] += delta['attempts']
+        total['score_sum'] += delta['score_sum']
+        if delta['last_completed_at'] and (total['last_completed_at'] is None or delta['last_completed_at'] > total['last_completed_at']):
+            total['last_completed_at'] = delta['last_completed_at']
+    for user_id, total in totals.items():
+        # avg_score goes first: MySQL evaluates SET assignments left to right on the updated row
+        values = [
+            (UserSummary.avg_score, func.round((UserSummary.score_sum + total['score_sum']) * 1.0 / (UserSummary.attempts + total['attempts']), 2)),
+            (UserSummary.attempts, UserSummary.attempts + total['attempts']),
+            (UserSummary.score_sum, UserSummary.score_sum + total['score_sum']),
+        ]
+        if total['last_completed_at'] is not None:
+            values.append((UserSummary.last_completed_at, case(
+                (or_(UserSummary.last_completed_at.is_(None), UserSummary.last_completed_at < total['last_completed_at']), total['last_completed_at']),
+                else_=UserSummary.last_completed_at
+            )))
+        bump = update(UserSummary).where(UserSummary.user_id == user_id).ordered_values(*values)
+        if db.session.execute(bump).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(UserSummary(user_id=user_id, avg_score=round(total['score_sum'] / total['attempts'], 2), **total))
+        except IntegrityError:
+            db.session.execute(bump)
+
+
+def expire_daily_scores():
+    """Delete day buckets that fell out of the retention window in the caller's transaction.
+
+    Runs at most once a day: the pass only counts once daily_scores_committed() sees its
+    transaction commit, so a rolled-back delete is retried by the next write.
+    """
+    oldest = oldest_kept_day()
+    if _expired_before == oldest:
+        return 0
+    deleted = db.session.query(UserDailyScore).filter(UserDailyScore.day < oldest).delete(synchronize_session=False)
+    db.session.info['daily_scores_expired_before'] = oldest
+    if deleted:
+        print(f"[{datetime.now()}] Expired {deleted} daily score buckets before {oldest}")
+    return deleted
+
+
+def daily_scores_committed():
+    """Remember the expiry pass run by the session's just-committed transaction, if any."""
+    global _expired_before
+    oldest = db.session.info.pop('daily_scores_expired_before', None)
+    if oldest is not None:
+        _expired_before = oldest
+
+
+def record_daily_scores(rows):
+    """Add newly stored attempts to the per-user day buckets in the caller's transaction."""
+    expire_daily_scores()
+    oldest = oldest_kept_day()
+    deltas = {}
+    for row in rows:
+        day = attempt_day(row)
+        if day < oldest:
+            continue  # Late offline upload outside every window
+        delta = deltas.setdefault((int(row['user_id']), day), [0, 0])
+        delta[0] += row['score']
+        delta[1] += 1
+    for (user_id, day), (points, attempts) in deltas.items():
+        bump = update(UserDailyScore).where(UserDailyScore.user_id == user_id, UserDailyScore.day == day).values(
+            points=UserDailyScore.points + points, attempts=UserDailyScore.attempts + attempts)
+        if db.session.execute(bump).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(UserDailyScore(user_id=user_id, day=day, points=points, attempts=attempts))
+        except IntegrityError:
+            db.session.execute(bump)
+
+
+def read_user_stats(user_id):
+    """Totals and per-category breakdown for one user, read from the rollup only."""
+    rows = db.session.query(UserStats, Category.name).outerjoin(
+        Category, Category.id == UserStats.category_key
+    ).filter(UserStats.user_id == user_id).order_by(UserStats.category_key).all()
+
+    def summarize(attempts, score_sum, best_score, time_sum, last_completed_at):
+        return {
+            'attempts': attempts,
+            'averageScore': round(score_sum / attempts, 2) if attempts else 0,
+            'bestScore': best_score,
+            'totalTime': time_sum,
+            'lastCompletedAt': last_completed_at.isoformat() if last_completed_at else None
+        }
+
+    categories = []
+    for stats, category_name in rows:
+        categories.append(dict(
+            summarize(stats.attempts, stats.score_sum, stats.best_score, stats.time_sum, stats.last_completed_at),
+            categoryId=stats.category_key or None,
+            category=category_name or 'All Categories'
+        ))
+    last_dates = [stats.last_completed_at for stats, _ in rows if stats.last_completed_at]
+    totals = summarize(
+        sum(stats.attempts for stats, _ in rows),
+        sum(stats.score_sum for stats, _ in rows),
+        max((stats.best_score for stats, _ in rows), default=0),
+        sum(stats.time_sum for stats, _ in rows),
+        max(last_dates) if last_dates else None
+    )
+    return {'totals': totals, 'categories': categories}
+
+
+def rebuild_user_stats():
+    """Recompute the stats rollup, the per-user summaries and the retained day buckets from quiz_history.
+
+    Returns the number of user_stats rows.
+    """
+    category_key = func.coalesce(QuizHistory.category_id, 0)
+    db.session.query(UserStats).delete()
+    db.session.execute(insert(UserStats).from_select(
+        ['user_id', 'category_key', 'attempts', 'score_sum', 'best_score', 'time_sum', 'last_completed_at'],
+        select(
+            QuizHistory.user_id,
+            category_key,
+            func.count(QuizHistory.id),
+            func.sum(QuizHistory.score),
+            func.max(QuizHistory.score),
+            func.coalesce(func.sum(QuizHistory.time_taken), 0),
+            func.max(QuizHistory.completed_at)
+        ).group_by(QuizHistory.user_id, category_key)
+    ))
+
+    attempts = func.coalesce(func.sum(UserStats.attempts), 0)
+    score_sum = func.coalesce(func.sum(UserStats.score_sum), 0)
+    db.session.query(UserSummary).delete()
+    db.session.execute(insert(UserSummary).from_select(
+        ['user_id', 'attempts', 'score_sum', 'avg_score', 'last_completed_at'],
+        select(
+            User.id,
+            attempts,
+            score_sum,
+            func.coalesce(func.round(score_sum * 1.0 / func.nullif(attempts, 0), 2), 0),
+            func.max(UserStats.last_completed_at)
+        ).outerjoin(UserStats, UserStats.user_id == User.id).group_by(User.id)
+    ))
+
+    day = func.date(QuizHistory.completed_at)
+    db.session.query(UserDailyScore).delete()
+    db.session.execute(insert(UserDailyScore).from_select(
+        ['user_id', 'day', 'points', 'attempts'],
+        select(QuizHistory.user_id, day, func.sum(QuizHistory.score), func.count(QuizHistory.id))
+        .where(QuizHistory.completed_at >= oldest_kept_day())
+        .group_by(QuizHistory.user_id, day)
+    ))
+    db.session.commit()
+    return db.session.query(func.count()).select_from(UserStats).scalar()
@@ -0,0 +1,133 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Config reads the environment at import time, so point it at a throwaway SQLite file first
+_db_dir = tempfile.mkdtemp(prefix='quiz-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+os.environ['SECRET_KEY'] = 'test-secret-key-that-is-long-enough-for-hs256'
+os.environ['DYNAMIC_QUIZ_PREFETCH'] = 'False'
+os.environ['HISTORY_WRITE_MODE'] = 'sync'
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [BACKEND_DIR, os.path.dirname(BACKEND_DIR)]
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app
+from backend.models import db, Admin, User, Category, Quiz, Question, StandaloneQuestion
+from backend.services import search_index, question_sampler, leaderboard, windowed_leaderboard
+from backend.services import user_stats
+from backend.services.answer_keys import answer_key_index
+from backend.services.category_cache import category_list_cache
+from backend.services.dynamic_quiz_buffer import dynamic_quiz_buffer
+from backend.services.history_writer import history_writer
+from backend.services.leaderboard import scoped_leaderboards
+from backend.services.quiz_cache import quiz_payload_cache
+from backend.services.seen_questions import seen_question_tracker
+
+SUBMIT_TIMES = {'time_taken': 30, 'started_at': '2025-01-01T00:00:00Z', 'completed_at': '2025-01-01T00:01:00Z'}
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    history_writer.stop()
+
+
+@pytest.fixture(autouse=True)
+def database(app):
+    """Fresh tables and freshly loaded in-process services for every test."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for cache in (answer_key_index, quiz_payload_cache, category_list_cache, dynamic_quiz_buffer, scoped_leaderboards):
+            cache.clear()
+        for user_id in list(seen_question_tracker._users):
+            seen_question_tracker.forget(user_id)
+        user_stats._expired_before = None
+        for service in (search_index, question_sampler, leaderboard, windowed_leaderboard):
+            service.rebuild()
+        yield db
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    """List of SQL statements executed while the test runs."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def auth_headers(user_id, role='user'):
+    token = create_access_token(identity=str(user_id), additional_claims={'role': role})
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def admin():
+    admin = Admin(username='admin', email='admin@example.com', password='secret')
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def user():
+    user = User(username='player', email='player@example.com', password='secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def category(admin):
+    category = Category(name='Science', admin_id=admin.id)
+    db.session.add(category)
+    db.session.commit()
+    return category
+
+
+def add_quizzes(category, count, questions_per_quiz=4):
+    """Create active quizzes with four-option questions whose answer is option 2."""
+    quizzes = []
+    for i in range(count):
+        quiz = Quiz(title=f'Quiz {i}', category_id=category.id, difficulty='easy', admin_id=category.admin_id,
+                    created_at=datetime(2025, 1, 1) + timedelta(hours=i % 7))
+        db.session.add(quiz)
+        db.session.flush()
+        for j in range(questions_per_quiz):
+            db.session.add(Question(quiz_id=quiz.id, question=f'Question {j}', options=['a', 'b', 'c', 'd'], answer='b'))
+        quizzes.append(quiz)
+    db.session.commit()
+    return quizzes
+
+
+def add_standalone_questions(category, count):
+    """Create four-option standalone questions whose answer is option 2; returns their ids."""
+    questions = [StandaloneQuestion(question=f'Standalone {i}', question_type='multiple_choice',
+                                    options=['w', 'x', 'y', 'z'], answer='x', category_id=category.id)
+                 for i in range(count)]
+    db.session.add_all(questions)
+    db.session.commit()
+    for question in questions:
+        question_sampler.add(question.id, category.id)
+    return [question.id for question in questions]
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app import create_app
+from config.config import Config
+from conftest import SUBMIT_TIMES, add_quizzes, add_standalone_questions, auth_headers
+from backend.models import db, QuizHistory, User
+from backend.services.history_writer import history_writer
+
+THREADS = 8
+SUBMITS_PER_THREAD = 10
+
+
+@pytest.fixture(params=['sync', 'committed'])
+def write_mode(request, app):
+    if request.param != 'sync':
+        history_writer.start(app, mode=request.param)
+    yield request.param
+    history_writer.stop()
+    history_writer.mode = 'sync'
+
+
+def attempt_numbers(user_id, quiz_id):
+    db.session.expire_all()
+    return sorted(number for (number,) in db.session.query(QuizHistory.attempt_number)
+                  .filter(QuizHistory.user_id == user_id, QuizHistory.quiz_id == quiz_id))
+
+
+def test_parallel_submits_number_attempts_uniquely(app, write_mode, user, category):
+    other = User(username='rival', email='rival@example.com', password='secret')
+    db.session.add(other)
+    db.session.commit()
+    quiz_id = add_quizzes(category, 1)[0].id
+    question_id = add_standalone_questions(category, 1)[0]
+    users = [user.id, other.id]
+    headers_of = {user_id: auth_headers(user_id) for user_id in users}
+    errors = []
+
+    def play(user_id, worker):
+        client = app.test_client()
+        headers = headers_of[user_id]
+        for i in range(SUBMITS_PER_THREAD):
+            if (worker + i) % 2:
+                payload = dict(SUBMIT_TIMES, quiz_id=str(quiz_id), total_questions=1,
+                               answers=[{'question_id': '1', 'option_id': 2}])
+            else:
+                payload = dict(SUBMIT_TIMES, quiz_id='dynamic', total_questions=1,
+                               answers=[{'question_id': str(question_id), 'option_id': 2}])
+            try:
+                response = client.post('/api/quizzes/submit', headers=headers, json=payload)
+                if response.status_code != 200:
+                    errors.append(response.get_json())
+            except Exception as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=play, args=(users[worker % 2], worker)) for worker in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    history_writer.stop()
+
+    assert errors == []
+    for user_id in users:
+        for scope in (quiz_id, None):
+            numbers = attempt_numbers(user_id, scope)
+            assert numbers == list(range(1, len(numbers) + 1))
+        assert len(attempt_numbers(user_id, quiz_id)) + len(attempt_numbers(user_id, None)) == THREADS // 2 * SUBMITS_PER_THREAD
+
+
+def test_writer_thread_starts_with_the_first_served_request(monkeypatch):
+    monkeypatch.setattr(Config, 'HISTORY_WRITE_MODE', 'committed')
+    app = create_app()
+    try:
+        assert not history_writer.enabled  # CLI commands build the app without serving it
+        app.test_client().get('/api/categories')
+        assert history_writer.enabled
+    finally:
+        history_writer.stop()
+        history_writer.mode = 'sync'
@@ -0,0 +1,71 @@
+from conftest import add_quizzes, auth_headers
+from backend.models import db
+
+
+def catalog_statements(client, statements, user, **params):
+    headers = auth_headers(user.id)
+    del statements[:]
+    response = client.get('/api/quizzes', headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+
+def test_catalog_statement_count_does_not_grow_with_catalog(client, statements, user, category):
+    add_quizzes(category, 5)
+    quizzes, small = catalog_statements(client, statements, user)
+    assert len(quizzes) == 5
+
+    add_quizzes(category, 45)
+    quizzes, large = catalog_statements(client, statements, user)
+    assert len(quizzes) == 50
+    assert large == small == 1
+
+
+def test_catalog_rows_carry_category_fields(client, statements, user, category):
+    add_quizzes(category, 3)
+    quizzes, count = catalog_statements(client, statements, user, category_id=category.id)
+    assert count == 1
+    assert {quiz['category']['name'] for quiz in quizzes} == {'Science'}
+    assert {quiz['category']['id'] for quiz in quizzes} == {str(category.id)}
+
+
+def test_catalog_page_statement_count_is_fixed(client, statements, user, category):
+    add_quizzes(category, 30)
+    page, first = catalog_statements(client, statements, user, limit=10)
+    assert len(page['quizzes']) == 10
+    page, second = catalog_statements(client, statements, user, limit=10, cursor=page['nextCursor'])
+    assert len(page['quizzes']) == 10
+    assert first == second == 1
+
+
+def walk_catalog(client, headers, **params):
+    ids, cursor = [], None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        page = client.get('/api/quizzes', headers=headers, query_string=query).get_json()
+        ids += [quiz['id'] for quiz in page['quizzes']]
+        cursor = page['nextCursor']
+        if not cursor:
+            return ids
+
+
+def test_catalog_pages_include_quizzes_without_created_at(client, user, category):
+    quizzes = add_quizzes(category, 9)
+    for quiz in quizzes[::3]:
+        quiz.created_at = None
+    db.session.commit()
+    headers = auth_headers(user.id)
+    undated = [str(quiz.id) for quiz in quizzes[::3]]
+
+    for sort in ('newest', 'oldest'):
+        full = [quiz['id'] for quiz in client.get('/api/quizzes', headers=headers, query_string={'sort': sort}).get_json()]
+        assert walk_catalog(client, headers, sort=sort, limit=2) == full
+        assert sorted(full[-3:]) == sorted(undated)
+
+
+def test_catalog_rejects_cursor_from_another_sort(client, user, category):
+    add_quizzes(category, 5)
+    headers = auth_headers(user.id)
+    page = client.get('/api/quizzes', headers=headers, query_string={'sort': 'title', 'limit': 2}).get_json()
+    response = client.get('/api/quizzes', headers=headers, query_string={'sort': 'newest', 'limit': 2, 'cursor': page['nextCursor']})
+    assert response.status_code == 400
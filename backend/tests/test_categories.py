@@ -0,0 +1,21 @@
+from conftest import add_standalone_questions, auth_headers
+from backend.models import db, Category, StandaloneQuestion
+from backend.services.question_sampler import question_sampler
+
+
+def test_deleting_a_category_drops_its_sampler_pool(client, admin, category):
+    other = Category(name='History', admin_id=admin.id)
+    db.session.add(other)
+    db.session.commit()
+    deleted_id, other_id = category.id, other.id
+    question_ids = add_standalone_questions(category, 5)
+    kept_ids = add_standalone_questions(other, 3)
+
+    response = client.delete(f'/api/categories/{deleted_id}', headers=auth_headers(admin.id, 'admin'))
+    assert response.status_code == 200
+
+    assert question_sampler.size(deleted_id) == 0
+    assert sorted(question_sampler.pool_ids(other_id)) == kept_ids
+    # The questions stay playable from the whole bank, now without a category
+    assert set(question_ids) <= set(question_sampler.pool_ids())
+    assert db.session.query(StandaloneQuestion).filter(StandaloneQuestion.category_id.is_(None)).count() == 5
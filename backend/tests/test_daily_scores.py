@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.models import db, UserDailyScore
+from backend.services import user_stats
+from backend.services.history_writer import attempts_committed, insert_attempts
+from backend.services.user_stats import attempt_day, oldest_kept_day, utc_today
+
+
+def history_row(user_id, completed_at):
+    return dict(user_id=user_id, quiz_id=None, category_id=None, score=50, total_questions=2, time_taken=30,
+                attempt_number=1, started_at=completed_at, completed_at=completed_at, status='completed')
+
+
+def test_attempt_day_is_the_utc_date():
+    late_evening = datetime(2025, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    assert attempt_day({'completed_at': late_evening}).isoformat() == '2025-03-02'
+    assert attempt_day({'completed_at': datetime(2025, 3, 1, 23, 30)}).isoformat() == '2025-03-01'
+
+
+def test_expiry_pass_counts_only_once_committed(user):
+    stale_day = oldest_kept_day() - timedelta(days=1)
+    db.session.add(UserDailyScore(user_id=user.id, day=stale_day, points=10, attempts=1))
+    db.session.commit()
+    row = history_row(user.id, datetime.now(timezone.utc))
+
+    insert_attempts([row])
+    db.session.rollback()
+    assert user_stats._expired_before is None
+    assert db.session.query(UserDailyScore).filter(UserDailyScore.day == stale_day).count() == 1
+
+    insert_attempts([row])
+    db.session.commit()
+    attempts_committed([row])
+    assert user_stats._expired_before == oldest_kept_day()
+    assert db.session.query(UserDailyScore).filter(UserDailyScore.day == stale_day).count() == 0
+    assert db.session.query(UserDailyScore.day).filter(UserDailyScore.user_id == user.id).scalar() == utc_today()
@@ -0,0 +1,64 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from backend.services.leaderboard import RankedLeaderboard, windowed_leaderboard
+
+
+def expected_order(points):
+    return sorted(points, key=lambda user_id: (-points[user_id], user_id))
+
+
+def test_ranks_and_pages_match_a_full_sort(monkeypatch):
+    monkeypatch.setattr(RankedLeaderboard, 'BLOCK', 4)
+    rng = random.Random(7)
+    board = RankedLeaderboard()
+    points = {user_id: rng.randrange(0, 50) for user_id in range(1, 120)}
+    board.load(points)
+
+    for _ in range(400):
+        user_id = rng.randrange(1, 160)
+        if rng.random() < 0.5:
+            delta = rng.randrange(-30, 10 ** 9 if rng.random() < 0.05 else 60)
+            board.add_points({user_id: delta}, add_missing=True)
+            points[user_id] = max(points.get(user_id, 0) + delta, 0)
+        else:
+            score = rng.randrange(0, 100)
+            board.raise_to({user_id: score})
+            points[user_id] = max(points.get(user_id, 0), score)
+
+        order = expected_order(points)
+        assert [entry['id'] for entry in board.page()] == order
+        probe = rng.choice(order)
+        assert board.rank_of(probe)['rank'] == order.index(probe) + 1
+        offset = rng.randrange(0, len(order))
+        assert [entry['id'] for entry in board.page(offset, 7)] == order[offset:offset + 7]
+
+
+def test_memory_does_not_depend_on_the_highest_total():
+    board = RankedLeaderboard()
+    board.load({1: 10 ** 12, 2: 5})
+    assert len(board._tree) == 2
+    assert [entry['rank'] for entry in board.page()] == [1, 2]
+
+
+def test_window_boards_are_updated_in_place():
+    now = datetime.now(timezone.utc)
+    rng = random.Random(11)
+    week, today = {}, {}
+    board = windowed_leaderboard._board('week')
+    for _ in range(200):
+        user_id, score = rng.randrange(1, 40), rng.randrange(0, 100)
+        days_ago = rng.choice([0, 3, 10])
+        windowed_leaderboard.add_attempts([{'user_id': user_id, 'score': score,
+                                            'completed_at': now - timedelta(days=days_ago)}])
+        if days_ago < 7:
+            week[user_id] = week.get(user_id, 0) + score
+        if days_ago == 0:
+            today[user_id] = today.get(user_id, 0) + score
+
+    assert windowed_leaderboard._board('week') is board  # Not invalidated and re-sorted
+    assert [entry['id'] for entry in windowed_leaderboard.page('week')] == expected_order(week)
+    assert [entry['id'] for entry in windowed_leaderboard.page('today')] == expected_order(today)
+    probe = expected_order(week)[5]
+    assert windowed_leaderboard.rank_of('week', probe)['points'] == week[probe]
+    assert windowed_leaderboard.total('week') == len(week)
@@ -0,0 +1,46 @@
+from backend.services.question_sampler import question_sampler
+from backend.services.seen_questions import SeenBitset
+from conftest import add_standalone_questions
+
+BANK = 2000
+
+
+class CountingBitset(SeenBitset):
+    """SeenBitset that counts membership checks, i.e. the work a draw does."""
+
+    def __init__(self):
+        super().__init__()
+        self.checks = 0
+
+    def __contains__(self, question_id):
+        self.checks += 1
+        return super().__contains__(question_id)
+
+
+def test_mostly_seen_pool_draws_exactly_the_unseen_ids(category):
+    question_ids = add_standalone_questions(category, BANK)
+    seen = CountingBitset()
+    for question_id in question_ids[:-15]:
+        seen.add(question_id)
+
+    first = question_sampler.sample_ids(10, category.id, exclude=seen)
+    assert len(set(first)) == 10 and set(first) <= set(question_ids[-15:])
+
+    for question_id in first:
+        seen.add(question_id)
+    seen.checks = 0
+    second = question_sampler.sample_ids(10, category.id, exclude=seen)
+    assert sorted(second) == sorted(set(question_ids[-15:]) - set(first))
+    # Later draws walk the unseen index, not the bank
+    assert seen.checks < 100
+
+
+def test_unseeing_ids_rebuilds_the_index(category):
+    question_ids = add_standalone_questions(category, 300)
+    seen = SeenBitset()
+    for question_id in question_ids:
+        seen.add(question_id)
+    assert question_sampler.sample_ids(5, category.id, exclude=seen) == []
+
+    seen.discard(question_ids[0])
+    assert question_sampler.sample_ids(5, category.id, exclude=seen) == [question_ids[0]]
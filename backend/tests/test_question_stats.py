@@ -0,0 +1,28 @@
+from conftest import SUBMIT_TIMES, add_quizzes, auth_headers
+from backend.models import db, QuestionStats, UserAnswer
+from backend.services.question_stats import rebuild_question_stats
+
+
+def counters():
+    return sorted((stats.quiz_key, stats.question_id, stats.option_key, stats.picks, stats.correct, stats.score_sum)
+                  for stats in db.session.query(QuestionStats))
+
+
+def test_backfill_matches_incremental_counters_for_same_time_attempts(client, user, category):
+    quiz = add_quizzes(category, 1)[0]
+    answers = [{'question_id': str(question.id), 'option_id': 2} for question in quiz.questions]
+    for _ in range(2):  # Same user, quiz and completion time
+        response = client.post('/api/quizzes/submit', headers=auth_headers(user.id),
+                               json=dict(SUBMIT_TIMES, quiz_id=str(quiz.id), total_questions=4, answers=answers))
+        assert response.status_code == 200
+    incremental = counters()
+    assert {row[3] for row in incremental} == {2}
+
+    rebuild_question_stats()
+    assert counters() == incremental
+
+
+def test_backfill_skips_answers_without_a_question(user):
+    db.session.add(UserAnswer(user_id=user.id, option_id=1, is_correct=False))
+    db.session.commit()
+    assert rebuild_question_stats() == 0
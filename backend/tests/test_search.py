@@ -0,0 +1,29 @@
+from backend.models import db, StandaloneQuestion
+from backend.services.search_index import search_index
+
+
+def add_question(text):
+    question = StandaloneQuestion(question=text, question_type='multiple_choice', options=['a', 'b'], answer='a')
+    db.session.add(question)
+    db.session.commit()
+    search_index.upsert_question(question)
+    return question.id
+
+
+def found(query):
+    return [key[1] for key, _ in search_index.search(query)]
+
+
+def test_trailing_stopword_matches_as_a_prefix():
+    theory = add_question('Which theory explains gravity?')
+    whale = add_question('Whales of the Pacific')
+
+    assert found('the') == [theory]
+    assert found('gravity the') == [theory]
+    assert found('wha') == [whale]
+    assert found('what') == []  # Stopwords alone are not indexed
+
+
+def test_inner_stopwords_are_still_ignored():
+    whale = add_question('Whales of the Pacific')
+    assert found('whales of pacific') == [whale]
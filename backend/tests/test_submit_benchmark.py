@@ -0,0 +1,38 @@
+from conftest import SUBMIT_TIMES, add_standalone_questions, auth_headers
+from backend.services.answer_keys import answer_key_index
+
+
+def submit_dynamic(client, headers, question_ids):
+    answers = [{'question_id': str(question_id), 'option_id': 2} for question_id in question_ids]
+    response = client.post('/api/quizzes/submit', headers=headers,
+                           json=dict(SUBMIT_TIMES, quiz_id='dynamic', total_questions=len(answers), answers=answers))
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['score'] == 100
+    return response
+
+
+def test_submit_statement_count_is_flat(client, statements, user, category):
+    question_ids = add_standalone_questions(category, 100)
+    headers = auth_headers(user.id)
+    submit_dynamic(client, headers, question_ids[:5])  # Warm the answer keys
+
+    counts = {}
+    for size in (10, 100):
+        del statements[:]
+        submit_dynamic(client, headers, question_ids[:size])
+        counts[size] = len(statements)
+    assert counts[10] == counts[100]
+
+
+def test_cold_submit_statement_count_is_flat(client, statements, user, category):
+    question_ids = add_standalone_questions(category, 200)
+    headers = auth_headers(user.id)
+    submit_dynamic(client, headers, question_ids[:5])  # The user's first attempt creates their summary rows
+
+    counts = {}
+    for size in (10, 200):
+        answer_key_index.clear()  # Answer keys are loaded in batches, never a round trip per answer
+        del statements[:]
+        submit_dynamic(client, headers, question_ids[:size])
+        counts[size] = len(statements)
+    assert counts[10] == counts[200]
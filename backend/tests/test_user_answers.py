@@ -0,0 +1,62 @@
+import routes.quiz_routes as quiz_routes
+from conftest import SUBMIT_TIMES, add_quizzes, add_standalone_questions, auth_headers
+from backend.models import db, UserAnswer
+from backend.services.question_stats import rebuild_question_stats
+
+QUESTIONS = 100
+
+
+def submission(quiz):
+    answers = [{'question_id': str(question.id), 'option_id': 2} for question in quiz.questions]
+    return dict(SUBMIT_TIMES, quiz_id=str(quiz.id), total_questions=len(answers), answers=answers)
+
+
+def submit_quiz(client, headers, payload):
+    response = client.post('/api/quizzes/submit', headers=headers, json=payload)
+    assert response.status_code == 200, response.get_json()
+    return response
+
+
+def submit_statements(client, statements, headers, payload):
+    del statements[:]
+    submit_quiz(client, headers, payload)
+    return len(statements)
+
+
+def test_answers_are_written_with_one_insert(client, statements, user, category):
+    quiz = add_quizzes(category, 1, questions_per_quiz=QUESTIONS)[0]
+    headers, payload = auth_headers(user.id), submission(quiz)
+    del statements[:]
+    submit_quiz(client, headers, payload)
+
+    inserts = [statement for statement in statements if statement.startswith('INSERT INTO user_answer')]
+    assert len(inserts) == 1
+    assert db.session.query(UserAnswer).filter(UserAnswer.quiz_id == quiz.id, UserAnswer.is_correct.is_(True)).count() == QUESTIONS
+
+
+def test_answer_rows_add_a_fixed_number_of_statements(client, monkeypatch, statements, user, category):
+    payloads = [submission(quiz) for quiz in (add_quizzes(category, 1, questions_per_quiz=size)[0] for size in (10, QUESTIONS))]
+    headers = auth_headers(user.id)
+    for payload in payloads:
+        submit_quiz(client, headers, payload)  # Warm the answer keys and counter rows
+
+    with_rows = [submit_statements(client, statements, headers, payload) for payload in payloads]
+    monkeypatch.setattr(quiz_routes, 'user_answer_rows', lambda *args: [])
+    without_rows = [submit_statements(client, statements, headers, payload) for payload in payloads]
+    added = [with_count - without_count for with_count, without_count in zip(with_rows, without_rows)]
+    print(f"statements added by answer rows: {added} for 10 and {QUESTIONS} answers")
+    assert added[0] == added[1] <= 4
+
+
+def test_deleting_a_question_drops_its_answers_before_backfill(client, admin, user, category):
+    question_ids = add_standalone_questions(category, 3)
+    answers = [{'question_id': str(question_id), 'option_id': 2} for question_id in question_ids]
+    response = client.post('/api/quizzes/submit', headers=auth_headers(user.id),
+                           json=dict(SUBMIT_TIMES, quiz_id='dynamic', total_questions=3, answers=answers))
+    assert response.status_code == 200
+
+    response = client.delete(f'/api/standalone-questions/{question_ids[0]}', headers=auth_headers(admin.id, 'admin'))
+    assert response.status_code == 200
+    assert db.session.query(UserAnswer).filter(UserAnswer.standalone_question_id.is_(None), UserAnswer.question_id.is_(None)).count() == 0
+    assert db.session.query(UserAnswer).count() == 2
+    assert rebuild_question_stats() == 2
@@ -0,0 +1,55 @@
+from datetime import datetime
+from decimal import Decimal
+
+from conftest import auth_headers
+from backend.models import db, User, UserSummary
+
+
+def add_users(count):
+    """Users 0..count-1; every third one has no summary row yet (never finished a quiz)."""
+    users = [User(username=f'user{i:02d}', email=f'user{i:02d}@example.com', password='secret') for i in range(count)]
+    db.session.add_all(users)
+    db.session.flush()
+    for i, user in enumerate(users):
+        if i % 3:
+            db.session.add(UserSummary(user_id=user.id, attempts=i % 4 + 1, score_sum=0,
+                                       avg_score=Decimal(i % 5 * 10), last_completed_at=datetime(2025, 1, 1 + i % 5)))
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def walk(client, headers, sort):
+    ids, cursor = [], None
+    while True:
+        params = {'sort': sort, 'limit': 4}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get('/api/users', headers=headers, query_string=params)
+        assert response.status_code == 200
+        page = response.get_json()
+        ids += [row['id'] for row in page['users']]
+        cursor = page['nextCursor']
+        if not cursor:
+            return ids
+
+
+def test_users_without_a_summary_are_listed_and_paged(client, admin):
+    user_ids = add_users(20)
+    headers = auth_headers(admin.id, 'admin')
+
+    listed = client.get('/api/users', headers=headers, query_string={'sort': 'quizzes'}).get_json()
+    assert sorted(row['id'] for row in listed) == user_ids
+    assert {(row['quizzes'], row['avgScore']) for row in listed if row['id'] == user_ids[0]} == {(0, 0.0)}
+
+    for sort in ('activity', 'score', 'quizzes', 'name'):
+        full = client.get('/api/users', headers=headers, query_string={'sort': sort}).get_json()
+        assert walk(client, headers, sort) == [row['id'] for row in full]
+
+
+def test_cursor_from_another_sort_is_rejected(client, admin):
+    add_users(10)
+    headers = auth_headers(admin.id, 'admin')
+    page = client.get('/api/users', headers=headers, query_string={'sort': 'score', 'limit': 3}).get_json()
+    response = client.get('/api/users', headers=headers,
+                          query_string={'sort': 'name', 'limit': 3, 'cursor': page['nextCursor']})
+    assert response.status_code == 400